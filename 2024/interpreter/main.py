@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+import itertools
 import os
 from manim import *
 import sys
@@ -7,6 +8,11 @@ script_dir = os.path.dirname(os.path.realpath(__file__))
 def local_path(path: str) -> str:
     return os.path.join(script_dir, path)
 
+sys.path.insert(0, os.path.join(script_dir, '..', '..'))
+import manim_videos.installed
+from manim_videos import play_keys
+from manim_videos.checkpoints import CheckpointScene
+
 monospace = "Monospace"
 if sys.platform == 'win32':
     monospace = 'consolas'
@@ -25,49 +31,64 @@ def eval_colors(mob: MathTex, strings):
     '''colors mob so it's yellow, except given strings are white'''
     return mob.set_color(YELLOW).set_color_by_tex_to_color_map(make_color_map(strings, WHITE))
 
-spaces = 0
+eval_ids = itertools.count()
 @dataclass
 class EvalOf:
-    '''wraps the source_strs in an eval(...) and adds unique whitespaces to eval and parens.
+    '''wraps the source_strs in an eval(...). the eval and parens are tagged with this EvalOf's id,
+    so they only match themselves in TransformMatchingEval, even though the tex is the same.
     '''
     # makes the eval and parentheses unique
-    spaces: int
+    id: int
     # source code strings, will become white and wrapped with yellow eval(...)
     source_strs: List[str]
     # tex strings to make white, wrapped with \mathtt{...}
     tts: List[str]
     # all tex strings to be rendered
     texs: List[str]
-    def __init__(self, *source_strs: str, spaces_: int = False):
-        global spaces
+    # TransformMatchingEval keys for texs
+    keys: List
+    def __init__(self, *source_strs: str):
         self.source_strs = source_strs
-        self.spaces = spaces_ or (spaces := spaces + 1)
+        self.id = next(eval_ids)
         self.tts = [r'\mathtt{' + tt + '}' for tt in source_strs]
-        self.texs = [' '*spaces+r'\mathrm{eval}', ' '*spaces+'(', *[tt for tt in self.tts], ' '*spaces+')']
+        self.texs = [r'\mathrm{eval}', '(', *self.tts, ')']
+        self.keys = [(r'\mathrm{eval}', self.id), ('(', self.id), *self.tts, (')', self.id)]
     
     def unique_copy(self):
-        '''copy the tex, but make the number of spaces unique'''
-        global spaces
-        return EvalOf(*self.source_strs, spaces_=(spaces := spaces + 1))
+        '''copy the tex, but with a new id so it doesn't match this one'''
+        return EvalOf(*self.source_strs)
 
 def EvalTex(*texs: str | EvalOf):
-    '''handles coloring
+    '''handles coloring and tagging
     Ex: EvalTex(EvalOf('2'), '+', EvalOf('3'))
     '''
     # TODO just color submobjects by index instead of doing a color map by substring
     texs_ = []
+    keys = []
     tts = []
     for tex in texs:
         if isinstance(tex, EvalOf):
             eval_of = tex
             texs_.extend(eval_of.texs)
+            keys.extend(eval_of.keys)
             tts.extend(eval_of.tts)
         else:
             texs_.append(tex)
-    return eval_colors(
-        MathTex(*texs_),
-        tts,
-    )
+            keys.append(tex)
+    mob = MathTex(*texs_)
+    # keys live on the parts instead of in the tex, so identical tex compiles (and caches) once
+    if len(mob.submobjects) != len(keys):
+        # without keys, TransformMatchingEval would quietly match these parts by their tex
+        raise ValueError(f'EvalTex made {len(mob.submobjects)} parts for {len(keys)} keys from {texs_}, does a string contain {{{{ }}}}?')
+    for part, key in zip(mob.submobjects, keys):
+        part.match_key = key
+    return eval_colors(mob, tts)
+
+class TransformMatchingEval(TransformMatchingTex):
+    '''TransformMatchingTex, but parts tagged by EvalTex match by their tag instead of their tex'''
+    @staticmethod
+    def get_mobject_key(mobject: Mobject):
+        return getattr(mobject, 'match_key', mobject.tex_string)
 
 @dataclass
 class Step:
@@ -79,32 +100,141 @@ class Step:
     # transformation
     should_transform: bool = True
 
-class InterpreterScene(Scene):
+def relative_keys(*groups: VGroup) -> list[list]:
+    '''the TransformMatchingEval keys of each group's parts, with EvalOf ids numbered in order
+    of appearance across the groups. two lists of groups with the same relative keys match up
+    the same way, whichever EvalOfs they were made from.
+    '''
+    ids = {}
+    def keys(group):
+        keys = []
+        for part in TransformMatchingEval.get_mobject_parts(group):
+            key = TransformMatchingEval.get_mobject_key(part)
+            if isinstance(key, tuple):
+                key = (key[0], ids.setdefault(key[1], len(ids)))
+            keys.append(key)
+        return keys
+    return [keys(group) for group in groups]
+
+def step_key(mob: VGroup, new_mob: VGroup):
+    '''what a step's transform depends on besides what's already on screen: the formulas it
+    transforms into, and how their parts match up. EvalOf ids are numbered in order of
+    appearance, so the key doesn't change between runs.
+    '''
+    return ('step', *relative_keys(mob, new_mob), play_keys.content_hash(new_mob))
+
+@dataclass(frozen=True)
+class PlannedStep:
+    '''a step with its placeholders resolved and its formulas in place'''
+    group: VGroup
+    # the animation into this step, None to swap it in without one (should_transform=False)
+    animation: Animation | None
+    # play_keys parts the animation's partial movie is cached by
+    key: tuple
+
+@dataclass(frozen=True)
+class StepPlan:
+    '''everything InterpreterScene.steps plays, worked out before the first play: False
+    placeholders resolved, formulas that look like one from an earlier step reusing it, every
+    formula laid out once, and each transform's parts paired up.
+    '''
+    steps: tuple[PlannedStep, ...]
+    # Unwrite of the last step, None to leave it on screen
+    unwrite: Animation | None
+
+    @staticmethod
+    def resolved(steps: List[Step]) -> list[list[MathTex]]:
+        '''each step's formulas, with the False placeholders swapped for the formulas they keep'''
+        rows = []
+        for number, step in enumerate(steps, 1):
+            row = []
+            for i, formula in enumerate(step.formulas):
+                if formula:
+                    row.append(formula)
+                elif not rows:
+                    raise ValueError(f'step 1 keeps formula {i + 1}, but there is no step before it')
+                elif i >= len(rows[-1]):
+                    raise ValueError(f'step {number} keeps formula {i + 1}, but step {number - 1} only has {len(rows[-1])}')
+                else:
+                    row.append(rows[-1][i])
+            rows.append(row)
+        return rows
+
+    @staticmethod
+    def deduplicated(rows: list[list[MathTex]]) -> list[list[MathTex]]:
+        '''rows with each formula that has the same row position, looks and relative keys as an
+        earlier one swapped for that one. formulas sharing an EvalOf with another formula keep
+        their own copy, since swapping them would change what their parts match.
+        '''
+        def eval_ids(formula):
+            keys = map(TransformMatchingEval.get_mobject_key, TransformMatchingEval.get_mobject_parts(formula))
+            return {key[1] for key in keys if isinstance(key, tuple)}
+        # EvalOf id -> the formulas with parts tagged by it
+        users = {}
+        for row in rows:
+            for formula in row:
+                for eval_id in eval_ids(formula):
+                    users.setdefault(eval_id, set()).add(id(formula))
+        def private(formula):
+            return all(users[eval_id] == {id(formula)} for eval_id in eval_ids(formula))
+
+        # row position, content hash before layout and relative keys -> the first formula that had them
+        seen = {}
+        swapped = {}
+        for row in rows:
+            for i, formula in enumerate(row):
+                signature = (i, play_keys.content_hash(formula), repr(relative_keys(formula)))
+                first = seen.setdefault(signature, formula)
+                if first is not formula and private(first) and private(formula):
+                    swapped[id(formula)] = first
+        return [[swapped.get(id(formula), formula) for formula in row] for row in rows]
+
+    @classmethod
+    def of(cls, steps: List[Step], keep_last=False) -> 'StepPlan':
+        rows = cls.deduplicated(cls.resolved(steps))
+        # the same as to_edge(UP).shift(DOWN * i), in one shift per formula
+        placed = set()
+        for row in rows:
+            for i, formula in enumerate(row):
+                if id(formula) not in placed:
+                    placed.add(id(formula))
+                    formula.shift(UP * (config.frame_y_radius - DEFAULT_MOBJECT_TO_EDGE_BUFFER - formula.get_top()[1] - i))
+        planned = []
+        for step, row in zip(steps, rows):
+            group = VGroup(*row)
+            if not planned:
+                planned.append(PlannedStep(group, Write(group), ('write', play_keys.content_hash(group))))
+            elif step.should_transform:
+                previous = planned[-1].group
+                planned.append(PlannedStep(group, TransformMatchingEval(previous, group), step_key(previous, group)))
+            else:
+                planned.append(PlannedStep(group, None, ()))
+        last = planned[-1].group if planned else VGroup()
+        unwrite = Unwrite(last) if not keep_last and len(last.submobjects) > 0 else None
+        return cls(tuple(planned), unwrite)
+
+class InterpreterScene(CheckpointScene):
     # the formula can also be False
     def steps(self, steps: List[Step], wait_time=1, keep_last=False) -> VGroup:
-        '''reduction steps'''
-        mob = False
-        for step in steps:
-            mobs = [formula and formula.to_edge(UP).shift(DOWN * i) for i, formula in enumerate(step.formulas)]
-            for i, formula in enumerate(mobs):
-                if not formula:
-                    mobs[i] = mob.submobjects[i]
-            new_mob = VGroup(*mobs)
-            if mob:
-                if step.should_transform:
-                    self.play(TransformMatchingTex(mob, new_mob))
+        '''reduction steps. each step's partial movie is keyed by its formulas, so editing one
+        step only re-renders the transitions into and out of it. the whole sequence is planned
+        (see StepPlan) before anything plays.
+        '''
+        plan = StepPlan.of(steps, keep_last)
+        mob = VGroup()
+        for step in plan.steps:
+            if step.animation is None:
+                self.remove(mob)
+                self.add(step.group)
+            else:
+                with play_keys.keyed(self, *step.key):
+                    self.play(step.animation)
                     if wait_time > 0:
                         self.wait(wait_time)
-                else:
-                    self.remove(mob)
-                    self.add(new_mob)
-            else:
-                self.play(Write(new_mob))
-                if wait_time > 0:
-                    self.wait(wait_time)
-            mob = new_mob
-        if not keep_last and len(mob.submobjects) > 0:
-            self.play(Unwrite(mob))
+            mob = step.group
+        if plan.unwrite is not None:
+            with play_keys.keyed(self, 'unwrite'):
+                self.play(plan.unwrite)
         return mob
 
 class Testing(InterpreterScene):
@@ -357,12 +487,20 @@ class Constants(Scene):
         self.wait(1)
 
 class Operations(InterpreterScene):
-    def construct(self):
+    sections = (
+        'title', 'operators', 'addition_rule', 'code',
+        'turtles', 'eval_highlight', 'type_error', 'evaluation_steps',
+        'division_by_zero', 'comparison', 'logic', 'short_circuit',
+        'negation',
+    )
+
+    def title(self):
         title = Text('Operations', font_size=42)
         self.play(Write(title))
         self.wait(1)
         self.play(Unwrite(title))
 
+    def operators(self):
         ops = VGroup(
             MathTex(r'\mathtt{+}'),
             MathTex(r'\mathtt{-}'),
@@ -378,6 +516,7 @@ class Operations(InterpreterScene):
         self.wait(1)
         self.play(Unwrite(addition))
 
+    def addition_rule(self):
         formulas = [
             MathTex(r'{{\mathtt{E_1}}} + {{\mathtt{E_2}}}'),
             MathTex(r'{{\mathtt{HUGE_1}}} + {{\mathtt{HUGE_2}}}'),
@@ -399,16 +538,19 @@ class Operations(InterpreterScene):
         self.wait(1)
         self.play(Unwrite(formulas[-1]))
 
+    def code(self):
         code = Text('eval(E1) + eval(E2)', font=monospace)
         self.play(Write(code))
         self.wait(1)
         self.play(Unwrite(code))
 
+    def turtles(self):
         turtles = ImageMobject(local_path('images/turtles.png')).scale(0.5)
         self.play(FadeIn(turtles))
         self.wait(1)
         self.play(FadeOut(turtles))
 
+    def eval_highlight(self):
         formula = MathTex(r'\text{eval}', '(', r'\mathtt{E_1}', ')', '+', r'\text{eval}', '(', r'\mathtt{E_2}', ')')
         formula_yellow = formula.copy()
         for tex in [r'\text{eval}', '+', '(', ')']:
@@ -421,6 +563,7 @@ class Operations(InterpreterScene):
         self.play(Unwrite(formula_yellow))
         self.wait(1)
 
+    def type_error(self):
         formulas = [
             MathTex(r'\mathtt{1 + {{true}}}'),
             MathTex(r'\mathtt{1 + {{1}}}'),
@@ -438,6 +581,7 @@ class Operations(InterpreterScene):
         self.play(Unwrite(formulas[-1]))
         self.wait(1)
 
+    def evaluation_steps(self):
         mob = self.steps([
             Step([
                 EvalTex(EvalOf('2 * 3', '\ +\ ', '10 / 2')),
@@ -579,6 +723,7 @@ class Operations(InterpreterScene):
         self.play(Unwrite(mob))
         self.wait(1)
 
+    def division_by_zero(self):
         formulas = [
             MathTex(r'\mathrm{eval}', '(', r'\mathtt{1}', '/', r'\mathtt{0}', ')').set_color(YELLOW).set_color_by_tex_to_color_map({
                 r'\mathtt{1}': WHITE, '/': WHITE, r'\mathtt{0}': WHITE,
@@ -602,7 +747,7 @@ class Operations(InterpreterScene):
         self.play(Unwrite(formulas[-1]))
         self.wait(1)
 
-        # comparison
+    def comparison(self):
         ops = VGroup(
             MathTex(r'\mathtt{<}'),
             MathTex(r'\mathtt{>}'),
@@ -626,8 +771,7 @@ class Operations(InterpreterScene):
         self.wait(1)
         self.play(Unwrite(mob))
 
-        # logic
-
+    def logic(self):
         ops = VGroup(
             MathTex(r'\mathtt{ \| }'),
             MathTex(r'\mathtt{ \&\& }'),
@@ -647,7 +791,7 @@ class Operations(InterpreterScene):
         self.wait(1)
         self.play(Unwrite(mob))
 
-        # short circuit
+    def short_circuit(self):
         formulas = [
             EvalTex(EvalOf('false', r'\|', 'HUGE')),
             EvalTex(r'\mathtt{false}', r'\|', EvalOf('HUGE')),
@@ -656,11 +800,11 @@ class Operations(InterpreterScene):
         self.play(Write(formulas[0]))
         self.wait(1)
         for a,b in zip(formulas, formulas[1:]):
-            self.play(TransformMatchingTex(a,b))
+            self.play(TransformMatchingEval(a,b))
             self.wait(1)
         self.play(Unwrite(formulas[-1]))
 
-        # not and negation
+    def negation(self):
         mob = EvalTex(
             EvalOf('!E1'),
             '=',
@@ -695,7 +839,7 @@ class If(InterpreterScene):
         self.play(Write(mob2))
         self.wait(1)
         mob3 = EvalTex(EvalOf('THN'))
-        self.play(FadeOut(mob2), TransformMatchingTex(mob, mob3))
+        self.play(FadeOut(mob2), TransformMatchingEval(mob, mob3))
         self.wait(1)
         self.play(Unwrite(mob3))
 
@@ -706,7 +850,7 @@ class If(InterpreterScene):
         self.play(Write(mob2))
         self.wait(1)
         mob3 = EvalTex(EvalOf('ELS'))
-        self.play(FadeOut(mob2), TransformMatchingTex(mob, mob3))
+        self.play(FadeOut(mob2), TransformMatchingEval(mob, mob3))
         self.wait(1)
         self.play(Unwrite(mob3))
 
@@ -0,0 +1,33 @@
+import shutil
+
+import pytest
+
+pytest.importorskip('manim')
+if shutil.which('latex') is None:
+    pytest.skip('EvalTex needs latex', allow_module_level=True)
+
+from manim_videos.scenes import find_video
+from manim_videos.serve import load
+
+main = load(find_video('interpreter'))
+
+
+def test_identical_steps_share_a_layout():
+    plan = main.StepPlan.of([
+        main.Step([main.EvalTex(main.EvalOf('2 * 3'))]),
+        main.Step([main.EvalTex(main.EvalOf('2 * 3'))]),
+    ])
+    first, second = plan.steps
+    assert first.group[0] is second.group[0]
+    assert second.key == main.step_key(first.group, second.group)
+
+
+def test_shared_eval_keeps_its_own_formula():
+    two = main.EvalOf('2')
+    plan = main.StepPlan.of([
+        main.Step([main.EvalTex(main.EvalOf('2'))]),
+        main.Step([main.EvalTex(r'\mathtt{10}', '/', two)]),
+        # matches the eval(2) of the step before, which the one of step 1 wouldn't
+        main.Step([main.EvalTex(two)]),
+    ])
+    assert plan.steps[2].group[0] is not plan.steps[0].group[0]
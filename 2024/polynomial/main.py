@@ -1,3 +1,4 @@
+from collections import OrderedDict
 from dataclasses import dataclass
 import os
 from manim import *
@@ -9,6 +10,12 @@ script_dir = os.path.dirname(os.path.realpath(__file__))
 def local_path(path: str) -> str:
     return os.path.join(script_dir, path)
 
+sys.path.insert(0, os.path.join(script_dir, '..', '..'))
+import manim_videos.installed
+from manim_videos.static_layer import static
+
+from polynomials import Polynomial, bisect, isolate_roots, newton, scan
+
 monospace = "Monospace"
 if sys.platform == 'win32':
     monospace = 'consolas'
@@ -16,6 +23,156 @@ elif sys.platform == 'darwin':
     monospace = 'monaco'
 
 
+class SampleCloud(PMobject):
+    '''many samples as one mobject, an array of positions and an rgba per sample.
+
+    cairo draws point clouds straight into the pixel array with numpy, so a
+    frame costs about the same for 10 samples as for 10k, unlike a Dot each.
+    samples are square, stroke_width pixels wide. opacity is the alpha of each
+    rgba, which manim_videos.point_clouds blends over the frame, so FadeIn and
+    FadeOut (through fade) and Transform (through interpolate_color) animate it.
+    '''
+    def __init__(self, stroke_width=20, **kwargs):
+        super().__init__(stroke_width=stroke_width, **kwargs)
+
+    def fade(self, darkness=0.5, family=True):
+        # PMobject leaves its rgbas alone here, so FadeOut wouldn't show
+        self.rgbas[:, 3] *= 1 - darkness
+        return super().fade(darkness, family)
+
+    def set_opacity(self, opacity, family=True):
+        self.rgbas[:, 3] = opacity
+        return self
+
+    def add_samples(self, points, color=YELLOW, opacity=0.5):
+        '''appends an (n, 3) array of scene points, all in one color'''
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        self.add_points(points, color=color, alpha=opacity)
+        return self
+
+    def add_graph_samples(self, axes, polynomial, xs, **kwargs):
+        '''appends the points (x, polynomial(x)) for an array of xs'''
+        xs = np.asarray(xs, dtype=float)
+        origin = axes.coords_to_point(0, 0)
+        x_unit = axes.coords_to_point(1, 0) - origin
+        y_unit = axes.coords_to_point(0, 1) - origin
+        return self.add_samples(origin + np.outer(xs, x_unit) + np.outer(polynomial(xs), y_unit), **kwargs)
+
+    def __len__(self):
+        return len(self.points)
+
+
+class ShowSamples(Animation):
+    '''reveals a SampleCloud's samples in the order they were added'''
+    def __init__(self, cloud: SampleCloud, **kwargs):
+        kwargs.setdefault('rate_func', linear)
+        super().__init__(cloud, introducer=True, **kwargs)
+
+    def begin(self):
+        self.all_points = self.mobject.points.copy()
+        self.all_rgbas = self.mobject.rgbas.copy()
+        super().begin()
+
+    def interpolate_mobject(self, alpha):
+        count = int(np.ceil(alpha * len(self.all_points)))
+        self.mobject.points = self.all_points[:count]
+        self.mobject.rgbas = self.all_rgbas[:count]
+
+
+class ZoomingGraph(VMobject):
+    '''the graph of a polynomial that stays smooth however far a MovingCamera zooms in.
+
+    every frame it re-samples only the x range the camera can see, at about a
+    sample every pixels_per_sample pixels of output (then refined where it
+    bends, see Polynomial.sample). the axes' x range is cut into 2^level
+    tiles, level picked so a tile is one to two frames wide, and each tile's
+    samples are cached, so a zoom computes each tile once and never draws more
+    than three tiles' worth of points. assumes linear axes and an unrotated frame.
+    '''
+    def __init__(self, axes, polynomial: Polynomial, frame, pixels_per_sample=6, tolerance=0.05, max_tiles=256, **kwargs):
+        super().__init__(**kwargs)
+        self.axes = axes
+        self.polynomial = polynomial
+        self.frame = frame
+        self.pixels_per_sample = pixels_per_sample
+        self.tolerance = tolerance
+        self.max_tiles = max_tiles
+        # scene points by (level, index), least recently used first
+        self.tiles: OrderedDict[tuple[int, int], np.ndarray] = OrderedDict()
+        self.shown = None
+        self.resample()
+        self.add_updater(lambda graph: graph.resample())
+
+    def visible_tiles(self) -> tuple[int, int, int]:
+        '''(level, first index, last index) of the tiles covering the frame'''
+        x_min, x_max = self.axes.x_range[:2]
+        origin = self.axes.coords_to_point(0, 0)
+        x_unit = self.axes.coords_to_point(1, 0) - origin
+        left, right = (
+            np.dot(self.frame.get_edge_center(side) - origin, x_unit) / np.dot(x_unit, x_unit)
+            for side in (LEFT, RIGHT)
+        )
+        level = max(0, int(np.floor(np.log2((x_max - x_min) / max(right - left, 1e-12)))))
+        tile_width = (x_max - x_min) / 2 ** level
+        first, last = np.clip(np.floor((np.array([left, right]) - x_min) / tile_width), 0, 2 ** level - 1).astype(int)
+        return level, int(first), int(last)
+
+    def tile(self, level: int, index: int) -> np.ndarray:
+        key = (level, index)
+        if key in self.tiles:
+            self.tiles.move_to_end(key)
+        else:
+            x_min, x_max = self.axes.x_range[:2]
+            tile_width = (x_max - x_min) / 2 ** level
+            # a tile is at most two frames wide, and this is enough for when it is
+            initial = int(np.ceil(2 * config.pixel_width / self.pixels_per_sample))
+            self.tiles[key] = self.polynomial.sample(
+                self.axes, (x_min + index * tile_width, x_min + (index + 1) * tile_width),
+                tolerance=self.tolerance, initial=initial, max_points=4 * initial,
+            )
+            if len(self.tiles) > self.max_tiles:
+                self.tiles.popitem(last=False)
+        return self.tiles[key]
+
+    def resample(self):
+        visible = self.visible_tiles()
+        if visible == self.shown:
+            return self
+        level, first, last = visible
+        # neighbouring tiles share their boundary sample
+        tiles = [self.tile(level, index)[1 if index > first else 0:] for index in range(first, last + 1)]
+        self.set_points_smoothly(np.concatenate(tiles))
+        self.shown = visible
+        return self
+
+
+def polynomial_axes() -> Axes:
+    return Axes(
+        x_range=[-10, 10, 1],
+        y_range=[-5, 5, 1],
+        # to avoid this, you can probably do masking with Intersection
+        x_length=FullScreenRectangle().width,
+        y_length=FullScreenRectangle().height,
+        x_axis_config={
+            "numbers_with_elongated_ticks": np.arange(-10, 10, 5),
+        },
+        tips=False,
+    )
+
+
+def interval_band(axes: Axes, lo, hi, color=YELLOW) -> Rectangle:
+    '''a translucent strip over the x interval [lo, hi], clipped to the axes'''
+    x_min, x_max = axes.x_range[:2]
+    y_min, y_max = axes.y_range[:2]
+    lo, hi = np.clip([lo, hi], x_min, x_max)
+    bottom_left, top_right = axes.coords_to_point(lo, y_min), axes.coords_to_point(hi, y_max)
+    width, height = (top_right - bottom_left)[:2]
+    return Rectangle(
+        width=max(width, 0.02), height=height,
+        stroke_width=0, fill_color=color, fill_opacity=0.2,
+    ).move_to((bottom_left + top_right) / 2)
+
+
 class Intro(Scene):
     def construct(self):
         p = MathTex(r'x^2 - x - 2 = 0').shift(UP)
@@ -46,61 +203,86 @@ class Intro(Scene):
         pass
 
 class SearchIntervals(Scene):
-    pass
+    def play_trace(self, axes, p, trace, band, color=YELLOW, step_time=0.5):
+        '''animates each step of a search trace: its probes appear, then band moves to its interval'''
+        for step in trace:
+            probes = SampleCloud(stroke_width=12).add_graph_samples(axes, p, step.xs, color=color, opacity=1)
+            self.play(ShowSamples(probes, run_time=step_time))
+            self.play(
+                Transform(band, interval_band(axes, step.lo, step.hi, color=color)),
+                FadeOut(probes),
+                run_time=step_time,
+            )
+
+    def construct(self):
+        axes = polynomial_axes()
+        p = Polynomial.from_roots([-7, -2.5, 1, 6], scale=.01)
+        graph = p.plot(axes, color=BLUE)
+        self.play(Create(axes), Create(graph))
 
+        # sturm: narrow (-10, 10] down to one interval per root
+        intervals, trace = isolate_roots(p, -10, 10)
+        band = interval_band(axes, -10, 10)
+        self.play(FadeIn(band))
+        self.play_trace(axes, p, trace.collapsed(8), band)
+        bands = VGroup(*(interval_band(axes, lo, hi) for lo, hi in intervals))
+        self.play(ReplacementTransform(band, bands))
+        self.wait()
 
-class Temp(Scene):
+        # bisection in the first interval, newton in the last
+        lo, hi = intervals[0]
+        _, trace = bisect(p, lo, hi, tolerance=1e-3)
+        self.play_trace(axes, p, trace.collapsed(6), bands[0], color=GREEN)
+        lo, hi = intervals[-1]
+        _, trace = newton(p, hi)
+        self.play_trace(axes, p, trace.collapsed(6), bands[-1], color=RED)
+        self.wait()
+        self.play(FadeOut(bands), Uncreate(graph), Uncreate(axes))
+
+
+class Temp(MovingCameraScene):
     def construct(self):
-        axes = Axes(
-            x_range=[-10, 10, 1],
-            y_range=[-5, 5, 1],
-            # to avoid this, you can probably do masking with Intersection
-            x_length=FullScreenRectangle().width,
-            y_length=FullScreenRectangle().height,
-            x_axis_config={
-                "numbers_with_elongated_ticks": np.arange(-10, 10, 5),
-            },
-            tips=False,
-        )
+        axes = polynomial_axes()
         
         axes_labels = axes.get_axis_labels()
-        p_fun = lambda x: .2 * (x - 2) * (x - 9)
-        p_graph = axes.plot(p_fun, color=BLUE)
+        p = Polynomial.from_roots([2, 9], scale=.2)
+        p_graph = ZoomingGraph(axes, p, self.camera.frame, color=BLUE)
 
-        plot = VGroup(axes, p_graph)
+        # drawn once per camera position while the dots are sampled and stepped
+        plot = static(VGroup(axes, p_graph))
         labels = VGroup(axes_labels)
         interval_start = 0.5
         interval_end = 5
-        start_line = axes.get_vertical_line(axes.coords_to_point(interval_start, p_fun(interval_start)))
-        end_line = axes.get_vertical_line(axes.coords_to_point(interval_end, p_fun(interval_end)))
+        start_line = axes.get_vertical_line(axes.coords_to_point(interval_start, p(interval_start)))
+        end_line = axes.get_vertical_line(axes.coords_to_point(interval_end, p(interval_end)))
         self.play(Create(plot), Create(labels), Create(start_line), Create(end_line))
 
         # add random dots
-        dots = []
-        for i in range(10):
-            x = random.random() * (interval_end - interval_start) + interval_start
-            y = p_fun(x)
-            point = axes.coords_to_point(x, y)
-            dot = Dot(point, color=YELLOW, fill_opacity=0.5)
-            dots.append(dot)
-            self.add(dot)
-            self.wait(0.1)
-        self.play(Uncreate(dot) for dot in dots)
+        xs = np.random.uniform(interval_start, interval_end, 10)
+        samples = SampleCloud().add_graph_samples(axes, p, xs)
+        self.play(ShowSamples(samples, run_time=len(xs) * 0.1))
+        self.play(FadeOut(samples))
 
         # steps
-        x = interval_start
-        x_step = 0.42
+        # the probe that first goes below zero is shown too
+        (lo, hi), trace = scan(p, interval_start, interval_end, 0.42)
         dots = []
-        while True:
-            point = axes.coords_to_point(x, p_fun(x))
-            dot = Dot(point, color=YELLOW, fill_opacity=0.5)
+        for step in trace.steps:
+            dot = Dot(axes.coords_to_point(step.xs[0], step.ys[0]), color=YELLOW, fill_opacity=0.5)
             dots.append(dot)
             self.play(Create(dot))
-            if not (p_fun(x) >= 0):
-                # want it to run one extra time
-                break
-            x += x_step
-        
-        # zoom in to new interval using moving scene
+
+        # zoom in to the new interval, then on to the root. p_graph re-samples as the frame shrinks
+        new_start_line = axes.get_vertical_line(axes.coords_to_point(lo, p(lo)))
+        new_end_line = axes.get_vertical_line(axes.coords_to_point(hi, p(hi)))
+        self.play(
+            FadeOut(*dots, labels),
+            ReplacementTransform(start_line, new_start_line),
+            ReplacementTransform(end_line, new_end_line),
+        )
+        frame = self.camera.frame
+        self.play(frame.animate.set(width=(axes.c2p(hi, 0) - axes.c2p(lo, 0))[0] * 1.5).move_to(axes.c2p((lo + hi) / 2, 0)))
+        self.play(frame.animate.set(width=config.frame_width / 1000).move_to(axes.c2p(2, 0)), run_time=3)
+        self.wait()
         
         return
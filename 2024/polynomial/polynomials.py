@@ -0,0 +1,294 @@
+'''polynomials and searches for their roots, without manim, so they can be tested on their own'''
+from dataclasses import dataclass
+
+import numpy as np
+
+
+class Polynomial:
+    '''a real polynomial, coefficients lowest degree first, so Polynomial([-2, -1, 1]) is x^2 - x - 2.
+    evaluates whole numpy arrays at once.
+    '''
+    def __init__(self, coefficients):
+        coefficients = np.trim_zeros(np.asarray(coefficients, dtype=float), 'b')
+        self.coefficients = coefficients if len(coefficients) else np.zeros(1)
+
+    @classmethod
+    def from_roots(cls, roots, scale=1.0):
+        '''scale * (x - r0) * (x - r1) * ...'''
+        return cls(scale * np.polynomial.polynomial.polyfromroots(roots))
+
+    @property
+    def degree(self) -> int:
+        return len(self.coefficients) - 1
+
+    def __call__(self, x):
+        # horner's method, one vectorized multiply-add per coefficient
+        x = np.asarray(x, dtype=float)
+        result = np.full_like(x, self.coefficients[-1])
+        for coefficient in self.coefficients[-2::-1]:
+            result = result * x + coefficient
+        return result if result.ndim else float(result)
+
+    def derivative(self) -> 'Polynomial':
+        return Polynomial(self.coefficients[1:] * np.arange(1, len(self.coefficients)))
+
+    def antiderivative(self, constant=0.0) -> 'Polynomial':
+        return Polynomial(np.concatenate([[constant], self.coefficients / np.arange(1, len(self.coefficients) + 1)]))
+
+    def __add__(self, other):
+        other = other if isinstance(other, Polynomial) else Polynomial([other])
+        return Polynomial(np.polynomial.polynomial.polyadd(self.coefficients, other.coefficients))
+
+    def __sub__(self, other):
+        return self + -(other if isinstance(other, Polynomial) else Polynomial([other]))
+
+    def __neg__(self):
+        return Polynomial(-self.coefficients)
+
+    def __mul__(self, other):
+        if isinstance(other, Polynomial):
+            return Polynomial(np.convolve(self.coefficients, other.coefficients))
+        return Polynomial(self.coefficients * other)
+
+    __radd__ = __add__
+    __rmul__ = __mul__
+
+    def __repr__(self):
+        return f'Polynomial({self.coefficients.tolist()})'
+
+    def sample(self, axes, x_range=None, tolerance=0.05, initial=64, max_points=4096):
+        '''scene points along the graph, denser where it bends.
+
+        starts from initial evenly spaced xs and keeps halving the segments
+        around any point where the graph turns by more than tolerance radians
+        (in scene space, so it's what you see), up to max_points.
+        assumes linear axes.
+        '''
+        x_min, x_max = x_range if x_range is not None else axes.x_range[:2]
+        origin = axes.coords_to_point(0, 0)
+        x_unit = axes.coords_to_point(1, 0) - origin
+        y_unit = axes.coords_to_point(0, 1) - origin
+
+        def to_scene(xs):
+            return origin + np.outer(xs, x_unit) + np.outer(self(xs), y_unit)
+
+        xs = np.linspace(x_min, x_max, initial)
+        points = to_scene(xs)
+        while len(xs) < max_points:
+            segments = np.diff(points, axis=0)
+            angles = np.arctan2(segments[:, 1], segments[:, 0])
+            turns = np.abs((np.diff(angles) + np.pi) % (2 * np.pi) - np.pi)
+            bent = np.flatnonzero(turns > tolerance)
+            if not len(bent):
+                break
+            # split both segments next to each bent point
+            split = np.unique(np.concatenate([bent, bent + 1]))[: (max_points - len(xs))]
+            new_xs = (xs[split] + xs[split + 1]) / 2
+            xs = np.insert(xs, split + 1, new_xs)
+            points = np.insert(points, split + 1, to_scene(new_xs), axis=0)
+        return points
+
+    def plot(self, axes, x_range=None, tolerance=0.05, max_points=4096, **kwargs):
+        '''like axes.plot(p), but sampled with sample(). a VMobject'''
+        from manim import VMobject
+
+        return VMobject(**kwargs).set_points_smoothly(
+            self.sample(axes, x_range, tolerance=tolerance, max_points=max_points)
+        )
+
+
+@dataclass(frozen=True, eq=False)
+class SearchStep:
+    '''one step of a root search: where it probed, and the interval (lo, hi) it
+    knows a root is in afterwards'''
+    kind: str
+    lo: float
+    hi: float
+    xs: np.ndarray
+    ys: np.ndarray
+
+    @staticmethod
+    def merge(steps: list['SearchStep']) -> 'SearchStep':
+        '''one step with all of steps' probes, ending where the last one ends'''
+        return SearchStep(
+            steps[-1].kind,
+            steps[-1].lo,
+            steps[-1].hi,
+            np.concatenate([step.xs for step in steps]),
+            np.concatenate([step.ys for step in steps]),
+        )
+
+
+class SearchTrace:
+    '''the steps a root search took, for turning into animations'''
+    def __init__(self, steps: list[SearchStep]):
+        self.steps = steps
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __iter__(self):
+        return iter(self.steps)
+
+    def collapsed(self, max_steps: int) -> 'SearchTrace':
+        '''at most max_steps steps. the last half stay as they are, since that's
+        where the search closes in, and the rest are merged into even runs'''
+        if len(self.steps) <= max_steps:
+            return self
+        keep = max_steps // 2
+        head, tail = self.steps[:len(self.steps) - keep], self.steps[len(self.steps) - keep:]
+        runs = np.array_split(np.arange(len(head)), max_steps - keep)
+        return SearchTrace([SearchStep.merge(head[run[0]:run[-1] + 1]) for run in runs if len(run)] + tail)
+
+
+def scan(p: Polynomial, start, stop, step) -> tuple[tuple[float, float] | None, SearchTrace]:
+    '''walks from start by step until p changes sign, like stepping along with a
+    calculator. the interval of the first sign change, or None if there's none
+    before stop, and a step per probe'''
+    xs = np.arange(start, stop + step / 2, step)
+    ys = p(xs)
+    if ys[0] == 0:
+        # every sample after would count as a change of sign from 0
+        return (xs[0], xs[0]), SearchTrace([SearchStep('scan', xs[0], xs[0], xs[:1], ys[:1])])
+    changed = np.flatnonzero(np.sign(ys[1:]) != np.sign(ys[0])) + 1
+    end = changed[0] + 1 if len(changed) else len(xs)
+    steps = [SearchStep('scan', x, stop, xs[i:i + 1], ys[i:i + 1]) for i, x in enumerate(xs[:end])]
+    if not len(changed):
+        return None, SearchTrace(steps)
+    interval = (xs[end - 2], xs[end - 1])
+    steps[-1] = SearchStep('scan', *interval, xs[end - 1:end], ys[end - 1:end])
+    return interval, SearchTrace(steps)
+
+
+def bisect(p: Polynomial, lo, hi, tolerance=1e-9, max_steps=200) -> tuple[float, SearchTrace]:
+    '''bisection on [lo, hi], where p changes sign'''
+    y_lo = p(lo)
+    steps = []
+    while hi - lo > tolerance and len(steps) < max_steps:
+        mid = (lo + hi) / 2
+        y_mid = p(mid)
+        if y_mid == 0:
+            lo = hi = mid
+        elif np.sign(y_mid) == np.sign(y_lo):
+            lo, y_lo = mid, y_mid
+        else:
+            hi = mid
+        steps.append(SearchStep('bisect', lo, hi, np.array([mid]), np.array([y_mid])))
+    return (lo + hi) / 2, SearchTrace(steps)
+
+
+def bisect_many(p: Polynomial, los, his, iterations=60) -> np.ndarray:
+    '''bisection on many sign-changing intervals at once, an array of roots'''
+    los, his = np.array(los, dtype=float), np.array(his, dtype=float)
+    sign_lo = np.sign(p(los))
+    for _ in range(iterations):
+        mids = (los + his) / 2
+        same = np.sign(p(mids)) == sign_lo
+        los = np.where(same, mids, los)
+        his = np.where(same, his, mids)
+    return (los + his) / 2
+
+
+def newton(p: Polynomial, x, tolerance=1e-12, max_steps=50) -> tuple[float, SearchTrace]:
+    '''newton's method from x. the interval of each step spans the last move'''
+    dp = p.derivative()
+    steps = []
+    for _ in range(max_steps):
+        y, slope = p(x), dp(x)
+        if slope == 0:
+            break
+        new_x = x - y / slope
+        steps.append(SearchStep('newton', min(x, new_x), max(x, new_x), np.array([x]), np.array([y])))
+        if abs(new_x - x) <= tolerance * max(1.0, abs(x)):
+            x = new_x
+            break
+        x = new_x
+    return x, SearchTrace(steps)
+
+
+def newton_many(p: Polynomial, xs, iterations=50) -> np.ndarray:
+    '''newton's method from many starting points at once'''
+    dp = p.derivative()
+    xs = np.array(xs, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for _ in range(iterations):
+            slopes = dp(xs)
+            xs = np.where(slopes != 0, xs - p(xs) / slopes, xs)
+    return xs
+
+
+def sturm_sequence(p: Polynomial) -> list[Polynomial]:
+    '''p, p', then negated remainders until they vanish. just p for a constant'''
+    if p.degree == 0:
+        return [p]
+
+    # only signs matter, so every member is scaled to a largest coefficient of 1
+    def normalized(q):
+        return Polynomial(q.coefficients / np.abs(q.coefficients).max())
+
+    sequence = [normalized(p), normalized(p.derivative())]
+    while sequence[-1].degree > 0:
+        _, remainder = np.polynomial.polynomial.polydiv(sequence[-2].coefficients, sequence[-1].coefficients)
+        remainder = np.where(np.abs(remainder) > 1e-12, remainder, 0)
+        if not remainder.any():
+            break
+        sequence.append(normalized(Polynomial(-remainder)))
+    return sequence
+
+
+def sign_changes(sequence: list[Polynomial], xs) -> np.ndarray:
+    '''sign changes along the sturm sequence at each x, skipping zeros'''
+    signs = np.sign(np.array([q(np.asarray(xs, dtype=float)) for q in sequence]))
+    rows = np.arange(len(sequence))[:, None]
+    # carry the last nonzero sign down over zeros
+    last_nonzero = np.maximum.accumulate(np.where(signs != 0, rows, 0), axis=0)
+    filled = np.take_along_axis(signs, last_nonzero, axis=0)
+    return np.sum(filled[1:] * filled[:-1] < 0, axis=0)
+
+
+def near_root(p: Polynomial, xs) -> np.ndarray:
+    '''where p(xs) is too close to 0 for rounding to get its sign right'''
+    xs = np.asarray(xs, dtype=float)
+    # bound on horner's rounding error, from the absolute values of every term
+    bound = Polynomial(np.abs(p.coefficients))(np.abs(xs))
+    return np.abs(p(xs)) <= 4 * len(p.coefficients) * np.finfo(float).eps * bound
+
+
+# where to split an interval in isolate_roots, tried in order until one isn't on a root
+_split_fractions = (1 / 2, 1 / 3, 2 / 3, 1 / 5, 4 / 5)
+
+
+def isolate_roots(p: Polynomial, lo, hi, width=1e-3, max_depth=60) -> tuple[list[tuple[float, float]], SearchTrace]:
+    '''intervals in (lo, hi] with exactly one distinct real root each, from sturm's theorem.
+
+    halves every interval with more than one root, a whole level at a time.
+    a split that would land on a root moves off it, since the sign there, and so
+    which half the root is counted in, is down to rounding.
+    intervals narrower than width with several roots (a cluster) are kept as they are.
+    '''
+    sequence = sturm_sequence(p)
+    intervals = np.array([[lo, hi]], dtype=float)
+    isolated, steps = [], []
+    for _ in range(max_depth):
+        if not len(intervals):
+            break
+        changes = sign_changes(sequence, intervals.ravel()).reshape(-1, 2)
+        counts = changes[:, 0] - changes[:, 1]
+        for (a, b), count in zip(intervals, counts):
+            if count:
+                steps.append(SearchStep('sturm', a, b, np.array([a, b]), p(np.array([a, b]))))
+        done = (counts == 1) | ((counts > 1) & (intervals[:, 1] - intervals[:, 0] < width))
+        isolated += [tuple(interval) for interval in intervals[done]]
+        splitting = intervals[(counts > 1) & ~done]
+        widths = splitting[:, 1] - splitting[:, 0]
+        mids = splitting[:, 0] + widths * _split_fractions[0]
+        for fraction in _split_fractions[1:]:
+            on_root = near_root(p, mids)
+            if not on_root.any():
+                break
+            mids[on_root] = splitting[on_root, 0] + widths[on_root] * fraction
+        intervals = np.concatenate([
+            np.stack([splitting[:, 0], mids], axis=1),
+            np.stack([mids, splitting[:, 1]], axis=1),
+        ])
+    return sorted(isolated), SearchTrace(steps)
@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+
+from polynomials import Polynomial, bisect, bisect_many, isolate_roots, newton, newton_many, scan, sturm_sequence
+
+
+class FlatAxes:
+    '''coords_to_point for axes with unit x and y, like polynomial_axes without manim'''
+    x_range = [-10, 10, 1]
+
+    def coords_to_point(self, x, y):
+        return np.array([x, y, 0.0])
+
+
+def test_horner_matches_numpy():
+    p = Polynomial([-2, -1, 1])
+    xs = np.linspace(-5, 5, 11)
+    assert np.allclose(p(xs), np.polynomial.polynomial.polyval(xs, [-2, -1, 1]))
+    assert p(2) == 0
+    assert isinstance(p(2), float)
+
+
+def test_trailing_zeros_are_dropped():
+    assert Polynomial([1, 2, 0, 0]).degree == 1
+    assert Polynomial([0, 0]).degree == 0
+
+
+def test_from_roots():
+    p = Polynomial.from_roots([2, 9], scale=.2)
+    assert np.allclose(p([2, 9]), 0)
+    assert np.isclose(p(0), .2 * 2 * 9)
+
+
+def test_derivative():
+    assert np.allclose(Polynomial([1, 2, 3]).derivative().coefficients, [2, 6])
+    assert np.allclose(Polynomial([5]).derivative().coefficients, [0])
+
+
+def test_antiderivative():
+    p = Polynomial([2, 6])
+    assert np.allclose(p.antiderivative(1).coefficients, [1, 2, 3])
+    assert np.allclose(p.antiderivative().derivative().coefficients, p.coefficients)
+
+
+def test_arithmetic():
+    a, b = Polynomial([1, 1]), Polynomial([-1, 1])
+    assert np.allclose((a * b).coefficients, [-1, 0, 1])
+    assert np.allclose((a + b).coefficients, [0, 2])
+    assert np.allclose((a - 1).coefficients, [0, 1])
+    assert np.allclose((2 * a).coefficients, [2, 2])
+
+
+def test_sample_refines_where_the_graph_bends():
+    points = Polynomial.from_roots([0], scale=1).sample(FlatAxes(), (-1, 1), initial=8)
+    # a straight line needs no more than the initial samples
+    assert len(points) == 8
+    points = Polynomial([0, 0, 1]).sample(FlatAxes(), (-1, 1), initial=8)
+    assert len(points) > 8
+    assert np.allclose(points[:, 1], points[:, 0] ** 2)
+    assert np.all(np.diff(points[:, 0]) > 0)
+
+
+def roots_in(interval, roots):
+    lo, hi = interval
+    return [root for root in roots if lo < root <= hi]
+
+
+def test_isolate_roots():
+    roots = [-7, -2.5, 1, 6]
+    intervals, trace = isolate_roots(Polynomial.from_roots(roots, scale=.01), -10, 10)
+    assert [roots_in(interval, roots) for interval in intervals] == [[root] for root in roots]
+    assert len(trace)
+
+
+def test_isolate_roots_on_midpoints():
+    # the first split of (0, 4] is at 2, of (0, 5] at 2.5, both roots
+    for roots, lo, hi in [([1, 2, 3], 0, 4), ([1, 2.5, 4], 0, 5), ([-1, 0, 1], -2, 2)]:
+        intervals, _ = isolate_roots(Polynomial.from_roots(roots), lo, hi)
+        assert [roots_in(interval, roots) for interval in intervals] == [[root] for root in roots]
+
+
+def test_sturm_sequence_of_a_constant():
+    sequence = sturm_sequence(Polynomial([-2]))
+    assert len(sequence) == 1
+    assert not np.isnan(sequence[0].coefficients).any()
+    assert isolate_roots(Polynomial([3]), -1, 1)[0] == []
+
+
+def test_scan():
+    p = Polynomial.from_roots([2, 9], scale=.2)
+    (lo, hi), trace = scan(p, 0.5, 5, 0.42)
+    assert lo < 2 <= hi
+    assert hi - lo == pytest.approx(0.42)
+    assert len(trace) == 5
+    assert scan(p, 2.5, 5, 0.5)[0] is None
+
+
+def test_scan_from_a_root():
+    (lo, hi), trace = scan(Polynomial.from_roots([2, 9]), 2, 5, 0.5)
+    assert lo == hi == 2
+    assert len(trace) == 1
+
+
+def test_bisect():
+    p = Polynomial.from_roots([-7, -2.5, 1, 6], scale=.01)
+    root, trace = bisect(p, 0.3, 2, tolerance=1e-9)
+    assert root == pytest.approx(1)
+    assert trace.steps[-1].hi - trace.steps[-1].lo <= 1e-9
+    # the first midpoint is the root
+    assert bisect(p, 0.5, 1.5)[0] == 1
+    assert np.allclose(bisect_many(p, [0, 5], [2, 7]), [1, 6])
+
+
+def test_newton():
+    p = Polynomial.from_roots([-7, -2.5, 1, 6], scale=.01)
+    root, trace = newton(p, 7)
+    assert root == pytest.approx(6)
+    assert all(step.lo <= step.hi for step in trace)
+    assert np.allclose(newton_many(p, [-8, 0.8, 7]), [-7, 1, 6])
+
+
+def test_collapsed_trace():
+    p = Polynomial.from_roots([-7, -2.5, 1, 6], scale=.01)
+    _, trace = bisect(p, 0.3, 2)
+    collapsed = trace.collapsed(6)
+    assert len(collapsed) == 6
+    assert collapsed.steps[-3:] == trace.steps[-3:]
+    assert sum(len(step.xs) for step in collapsed) == len(trace)
@@ -7,6 +7,10 @@ script_dir = os.path.dirname(os.path.realpath(__file__))
 def local_path(path: str) -> str:
     return os.path.join(script_dir, path)
 
+sys.path.insert(0, os.path.join(script_dir, '..', '..'))
+import manim_videos.installed
+from manim_videos.glyph_map import TransformByGlyphDiff, glyph_ranges, glyphs
+
 monospace = "Monospace"
 if sys.platform == 'win32':
     monospace = 'consolas'
@@ -46,57 +50,71 @@ class TypeGrammar(Scene):
         )
         self.add(type_grammar)
 
-numRule = MathTex(
-    r"\frac{}{\Gamma \vdash n : \text{Number}}(\text{NUM})"
-)
-trueRule = MathTex(
-    r"\frac{}{\Gamma \vdash \text{true} : \text{Boolean}}(\text{TRUE})"
-)
-falseRule = MathTex(
-    r"\frac{}{\Gamma \vdash \text{false} : \text{Boolean}}(\text{FALSE})"
-)
-letRule = MathTex(
-    r"\frac{\Gamma \vdash e_1 : \tau_1 \qquad \Gamma,x:\tau_1 \vdash e_2 : \tau_2}{\Gamma \vdash \text{let}~x = e_1~\text{in}~e_2 : \tau_2}(\text{LET})"
-)
-varRule = MathTex(
-    r"\frac{\Gamma [x] = \tau}{\Gamma \vdash x : \tau}(\text{VAR})"
-)
-plusRule = MathTex(
-    r"\frac{\Gamma \vdash e_1 : \text{Number} \qquad \Gamma \vdash e_2 : \text{Number}}{\Gamma \vdash e_1 + e_2 : \text{Number}}(\text{PLUS})"
-)
-orRule = MathTex(
-    r"\frac{\Gamma \vdash e_1 : \text{Boolean} \qquad \Gamma \vdash e_2 : \text{Boolean}}{\Gamma \vdash e_1 \mid\mid e_2 : \text{Boolean}}(\text{OR})"
-)
-equalRule = MathTex(
-    r"\frac{\Gamma \vdash e_1 : \tau \qquad \Gamma \vdash e_2 : \tau}{\Gamma \vdash e_1 == e_2 : \text{Boolean}}(\text{EQ})"
-)
-funRule = MathTex(
-    r"\frac{\Gamma,x:\tau_x \vdash e : \tau_e}{\Gamma \vdash \text{fun}~(x : \tau_x) \rightarrow e : \tau_x \rightarrow \tau_e}(\text{FUN})"
-)
-callRule = MathTex(
-    r"\frac{\Gamma \vdash e_1 : \tau_{\text{arg}} \rightarrow \tau_{\text{ret}} \qquad \Gamma \vdash e_2 : \tau_{\text{arg}}}{\Gamma \vdash e_1(e_2) : \tau_{\text{ret}}}(\text{CALL})"
+class LazyRules:
+    '''rule formulas, each built (and compiled) the first time it's accessed, then memoized
+    for the rest of the process. importing this file doesn't run latex.
+    '''
+    def __init__(self, **builders):
+        self._builders = builders
+        self._built = {}
+
+    def __getattr__(self, name):
+        if name.startswith('_') or name not in self._builders:
+            raise AttributeError(name)
+        if name not in self._built:
+            self._built[name] = self._builders[name]()
+        return self._built[name]
+
+rules = LazyRules(
+    numRule=lambda: MathTex(
+        r"\frac{}{\Gamma \vdash n : \text{Number}}(\text{NUM})"
+    ),
+    trueRule=lambda: MathTex(
+        r"\frac{}{\Gamma \vdash \text{true} : \text{Boolean}}(\text{TRUE})"
+    ),
+    falseRule=lambda: MathTex(
+        r"\frac{}{\Gamma \vdash \text{false} : \text{Boolean}}(\text{FALSE})"
+    ),
+    letRule=lambda: MathTex(
+        r"\frac{\Gamma \vdash e_1 : \tau_1 \qquad \Gamma,x:\tau_1 \vdash e_2 : \tau_2}{\Gamma \vdash \text{let}~x = e_1~\text{in}~e_2 : \tau_2}(\text{LET})"
+    ),
+    varRule=lambda: MathTex(
+        r"\frac{\Gamma [x] = \tau}{\Gamma \vdash x : \tau}(\text{VAR})"
+    ),
+    plusRule=lambda: MathTex(
+        r"\frac{\Gamma \vdash e_1 : \text{Number} \qquad \Gamma \vdash e_2 : \text{Number}}{\Gamma \vdash e_1 + e_2 : \text{Number}}(\text{PLUS})"
+    ),
+    orRule=lambda: MathTex(
+        r"\frac{\Gamma \vdash e_1 : \text{Boolean} \qquad \Gamma \vdash e_2 : \text{Boolean}}{\Gamma \vdash e_1 \mid\mid e_2 : \text{Boolean}}(\text{OR})"
+    ),
+    equalRule=lambda: MathTex(
+        r"\frac{\Gamma \vdash e_1 : \tau \qquad \Gamma \vdash e_2 : \tau}{\Gamma \vdash e_1 == e_2 : \text{Boolean}}(\text{EQ})"
+    ),
+    funRule=lambda: MathTex(
+        r"\frac{\Gamma,x:\tau_x \vdash e : \tau_e}{\Gamma \vdash \text{fun}~(x : \tau_x) \rightarrow e : \tau_x \rightarrow \tau_e}(\text{FUN})"
+    ),
+    callRule=lambda: MathTex(
+        r"\frac{\Gamma \vdash e_1 : \tau_{\text{arg}} \rightarrow \tau_{\text{ret}} \qquad \Gamma \vdash e_2 : \tau_{\text{arg}}}{\Gamma \vdash e_1(e_2) : \tau_{\text{ret}}}(\text{CALL})"
+    ),
+    letFunRule=lambda: MathTex(
+        r"\frac{\Gamma,f:\tau_x \rightarrow \tau_1,x:\tau_x \vdash e_1 : \tau_1 \qquad \Gamma,f:\tau_x \rightarrow \tau_1 \vdash e_2 : \tau_2}{\Gamma \vdash \text{letfun}~f (x : \tau_x) \rightarrow e_1~\text{in}~e_2 : \tau_2}(\text{LETFUN})"
+    ).scale(0.8),
+    letCheckExample=lambda: MathTex(
+        r"""
+        \cfrac{\displaystyle
+          \cfrac{}{\displaystyle \cdot \vdash 1 : \text{Number}}(\text{NUM})
+          \qquad
+          \cfrac{}{\displaystyle x:\text{Number} \vdash x : \text{Number}}(\text{VAR})
+        }{\displaystyle
+          \cdot \vdash \text{let}~x = 1~\text{in}~x : \text{Number}
+        }(\text{LET})
+        """
+    ).scale(0.8),
 )
-letFunRule = MathTex(
-    r"\frac{\Gamma,f:\tau_x \rightarrow \tau_1,x:\tau_x \vdash e_1 : \tau_1 \qquad \Gamma,f:\tau_x \rightarrow \tau_1 \vdash e_2 : \tau_2}{\Gamma \vdash \text{letfun}~f (x : \tau_x) \rightarrow e_1~\text{in}~e_2 : \tau_2}(\text{LETFUN})"
-).scale(0.8)
-
-
-letCheckExample = MathTex(
-    r"""
-    \cfrac{\displaystyle
-      \cfrac{}{\displaystyle \cdot \vdash 1 : \text{Number}}(\text{NUM})
-      \qquad
-      \cfrac{}{\displaystyle x:\text{Number} \vdash x : \text{Number}}(\text{VAR})
-    }{\displaystyle
-      \cdot \vdash \text{let}~x = 1~\text{in}~x : \text{Number}
-    }(\text{LET})
-    """
-)
-letCheckExample.scale(0.8)
 
 class Test(Scene):
     def construct(self):
-        self.add(letCheckExample)
+        self.add(rules.letCheckExample)
 
 class Intro(Scene):
     def construct(self):
@@ -417,11 +435,21 @@ class Rules(Scene):
         labels = index_labels(call_rule[0])
         self.play(Write(call_rule))
         self.wait()
-        self.play(*[Circumscribe(call_rule[0][a:b]) for a,b in [[26,28],[2,14]]])
+        self.play(
+            Circumscribe(glyphs(call_rule, r"e_1", occurrence=1)),
+            Circumscribe(glyphs(call_rule, r"e_1 : \tau_{\text{arg}} \rightarrow \tau_{\text{ret}}")),
+        )
         self.wait()
-        self.play(*[Circumscribe(call_rule[0][a:b]) for a,b in [[5,9],[29,31],[16,23]]])
+        self.play(
+            Circumscribe(glyphs(call_rule, r"\tau_{\text{arg}}")),
+            Circumscribe(glyphs(call_rule, r"e_2", occurrence=1)),
+            Circumscribe(glyphs(call_rule, r"e_2 : \tau_{\text{arg}}")),
+        )
         self.wait()
-        self.play(*[Circumscribe(call_rule[0][a:b]) for a,b in [[10,14],[33,37]]])
+        self.play(
+            Circumscribe(glyphs(call_rule, r"\tau_{\text{ret}}")),
+            Circumscribe(glyphs(call_rule, r"\tau_{\text{ret}}", occurrence=1)),
+        )
         self.wait()
         # self.add(labels)
         self.play(Unwrite(call_rule))
@@ -452,6 +480,14 @@ class Rules(Scene):
         self.play(Unwrite(let_fun_rule))
         self.wait()
 
+def color_arrows(rule: MathTex) -> MathTex:
+    '''colors inference (\\Rightarrow) red and checking (\\Leftarrow) blue, found by their glyphs'''
+    for piece, color in ((r"\Rightarrow", RED), (r"\Leftarrow", BLUE)):
+        for where in glyph_ranges(rule, piece):
+            rule[0][where].set_color(color)
+    return rule
+
+
 class Algorithm(Scene):
     def construct(self):
         check_vs_inference = VGroup(Text("Checking"), Text("vs."), Text("Inference")).arrange(direction=DOWN).center().scale(1.5)
@@ -496,21 +532,18 @@ class Algorithm(Scene):
         self.wait()
         self.play(Unwrite(group_infer))
 
-        let_rule = MathTex(
+        let_rule = color_arrows(MathTex(
             r"\frac{\Gamma \vdash e_1 \Rightarrow \tau_1 \qquad \Gamma,x:\tau_1 \vdash e_2 \Rightarrow \tau_2}{\Gamma \vdash \text{let}~x = e_1~\text{in}~e_2 \Rightarrow \tau_2}(\text{LET})"
-        )
+        ))
         labels = index_labels(let_rule[0])
-        for idx in [4,16,33]:
-            let_rule[0][idx].set_color(RED)
         self.play(Write(let_rule))
         self.wait()
         # self.add(labels)
         self.play(Unwrite(let_rule))
 
-        var_rule = MathTex(
+        var_rule = color_arrows(MathTex(
             r"\frac{\Gamma [x] = \tau}{\Gamma \vdash x \Rightarrow \tau}(\text{VAR})"
-        )
-        var_rule[0][10].set_color(RED)
+        ))
         self.play(Write(var_rule))
         self.wait()
         self.play(Unwrite(var_rule))
@@ -525,33 +558,23 @@ class Algorithm(Scene):
         group = VGroup(plus_rule, or_rule).arrange(direction=DOWN, buff=2).center()
         self.play(Write(group))
         self.wait()
-        plus_rule2 = MathTex(
+        plus_rule2 = color_arrows(MathTex(
             r"\frac{\Gamma \vdash e_1 \Leftarrow \text{Number} \qquad \Gamma \vdash e_2 \Leftarrow \text{Number}}{\Gamma \vdash e_1 + e_2 : \text{Number}}(\text{PLUS})"
-        )
-        plus_rule2[0][4].set_color(BLUE)
-        plus_rule2[0][15].set_color(BLUE)
-        or_rule2 = MathTex(
+        ))
+        or_rule2 = color_arrows(MathTex(
             r"\frac{\Gamma \vdash e_1 \Leftarrow \text{Boolean} \qquad \Gamma \vdash e_2 \Leftarrow \text{Boolean}}{\Gamma \vdash e_1 \mid\mid e_2 : \text{Boolean}}(\text{OR})"
-        )
-        or_rule2[0][4].set_color(BLUE)
-        or_rule2[0][16].set_color(BLUE)
+        ))
         group2 = VGroup(plus_rule2, or_rule2).arrange(direction=DOWN, buff=2).center()
-        self.play(TransformByGlyphMap(plus_rule, plus_rule2, ([0],[0])),TransformByGlyphMap(or_rule,or_rule2, ([0],[0])))
+        self.play(TransformByGlyphDiff(plus_rule, plus_rule2),TransformByGlyphDiff(or_rule,or_rule2))
         self.wait()
-        plus_rule3 = MathTex(
+        plus_rule3 = color_arrows(MathTex(
             r"\frac{\Gamma \vdash e_1 \Leftarrow \text{Number} \qquad \Gamma \vdash e_2 \Leftarrow \text{Number}}{\Gamma \vdash e_1 + e_2 \Rightarrow \text{Number}}(\text{PLUS})"
-        )
-        plus_rule3[0][4].set_color(BLUE)
-        plus_rule3[0][15].set_color(BLUE)
-        plus_rule3[0][30].set_color(RED)
-        or_rule3 = MathTex(
+        ))
+        or_rule3 = color_arrows(MathTex(
             r"\frac{\Gamma \vdash e_1 \Leftarrow \text{Boolean} \qquad \Gamma \vdash e_2 \Leftarrow \text{Boolean}}{\Gamma \vdash e_1 \mid\mid e_2 \Rightarrow \text{Boolean}}(\text{OR})"
-        )
-        or_rule3[0][4].set_color(BLUE)
-        or_rule3[0][16].set_color(BLUE)
-        or_rule3[0][33].set_color(RED)
+        ))
         group3 = VGroup(plus_rule3, or_rule3).arrange(direction=DOWN, buff=2).center()
-        self.play(TransformByGlyphMap(plus_rule2, plus_rule3, ([0],[0])),TransformByGlyphMap(or_rule2,or_rule3, ([0],[0])))
+        self.play(TransformByGlyphDiff(plus_rule2, plus_rule3),TransformByGlyphDiff(or_rule2,or_rule3))
         self.wait()
         self.play(Unwrite(group3))
         self.wait()
@@ -559,28 +582,22 @@ class Algorithm(Scene):
         equal_rule1 = MathTex(
             r"\frac{\Gamma \vdash e_1 : \tau \qquad \Gamma \vdash e_2 : \tau}{\Gamma \vdash e_1 == e_2 : \text{Boolean}}(\text{EQ})"
         )
-        equal_rule2 = MathTex(
+        equal_rule2 = color_arrows(MathTex(
             r"\frac{\Gamma \vdash e_1 \Rightarrow \tau \qquad \Gamma \vdash e_2 : \tau}{\Gamma \vdash e_1 == e_2 : \text{Boolean}}(\text{EQ})"
-        )
-        equal_rule2[0][4].set_color(RED)
-        equal_rule3 = MathTex(
+        ))
+        equal_rule3 = color_arrows(MathTex(
             r"\frac{\Gamma \vdash e_1 \Rightarrow \tau \qquad \Gamma \vdash e_2 \Leftarrow \tau}{\Gamma \vdash e_1 == e_2 : \text{Boolean}}(\text{EQ})"
-        )
-        equal_rule3[0][4].set_color(RED)
-        equal_rule3[0][10].set_color(BLUE)
-        equal_rule4 = MathTex(
+        ))
+        equal_rule4 = color_arrows(MathTex(
             r"\frac{\Gamma \vdash e_1 \Rightarrow \tau \qquad \Gamma \vdash e_2 \Leftarrow \tau}{\Gamma \vdash e_1 == e_2 \Rightarrow \text{Boolean}}(\text{EQ})"
-        )
-        equal_rule4[0][4].set_color(RED)
-        equal_rule4[0][10].set_color(BLUE)
-        equal_rule4[0][21].set_color(RED)
+        ))
         self.play(Write(equal_rule1))
         self.wait()
-        self.play(TransformByGlyphMap(equal_rule1,equal_rule2, ([],[])))
+        self.play(TransformByGlyphDiff(equal_rule1,equal_rule2))
         self.wait()
-        self.play(TransformByGlyphMap(equal_rule2,equal_rule3, ([],[])))
+        self.play(TransformByGlyphDiff(equal_rule2,equal_rule3))
         self.wait()
-        self.play(TransformByGlyphMap(equal_rule3,equal_rule4, ([],[])))
+        self.play(TransformByGlyphDiff(equal_rule3,equal_rule4))
         self.wait()
         self.play(Unwrite(equal_rule4))
         self.wait()
@@ -602,29 +619,19 @@ class Algorithm(Scene):
                 r"\frac{\Gamma \vdash e_1 \Leftarrow \text{Boolean} \qquad \Gamma \vdash e_2 \Rightarrow \tau \qquad \Gamma \vdash e_3 \Leftarrow \tau}{\Gamma \vdash \text{if}~e_1~\text{then}~e_2~\text{else}~e_3 \Rightarrow \tau}(\text{IF})"
             ),
         ]
-        if_rules[1][0][4].set_color(BLUE)
-        if_rules[2][0][4].set_color(BLUE)
-        if_rules[2][0][16].set_color(RED)
-        if_rules[3][0][4].set_color(BLUE)
-        if_rules[3][0][16].set_color(RED)
-        if_rules[3][0][22].set_color(BLUE)
-        if_rules[4][0][4].set_color(BLUE)
-        if_rules[4][0][16].set_color(RED)
-        if_rules[4][0][22].set_color(BLUE)
-        if_rules[4][0][43].set_color(RED)
+        for rule in if_rules:
+            color_arrows(rule)
         self.play(Write(if_rules[0]))
         self.wait()
         for a,b in zip(if_rules,if_rules[1::]):
-            self.play(TransformByGlyphMap(a,b,([],[])))
+            self.play(TransformByGlyphDiff(a,b))
             self.wait()
         self.play(Unwrite(if_rules[-1]))
         self.wait()
         
-        fun_rule = MathTex(
+        fun_rule = color_arrows(MathTex(
             r"\frac{\Gamma,x:\tau_x \vdash e \Rightarrow \tau_e}{\Gamma \vdash \text{fun}~(x : \tau_x) \rightarrow e \Rightarrow \tau_x \rightarrow \tau_e}(\text{FUN})"
-        )
-        fun_rule[0][8].set_color(RED)
-        fun_rule[0][25].set_color(RED)
+        ))
         self.play(Write(fun_rule))
         self.wait()
         self.play(Unwrite(fun_rule))
@@ -644,16 +651,12 @@ class Algorithm(Scene):
                 r"\frac{\Gamma \vdash e_1 \Rightarrow \tau_{\text{arg}} \rightarrow \tau_{\text{ret}} \qquad \Gamma \vdash e_2 \Leftarrow \tau_{\text{arg}}}{\Gamma \vdash e_1(e_2) \Rightarrow \tau_{\text{ret}}}(\text{CALL})"
             ),
         ]
-        call_rules[1][0][4].set_color(RED)
-        call_rules[2][0][4].set_color(RED)
-        call_rules[2][0][18].set_color(BLUE)
-        call_rules[3][0][4].set_color(RED)
-        call_rules[3][0][18].set_color(BLUE)
-        call_rules[3][0][32].set_color(RED)
+        for rule in call_rules:
+            color_arrows(rule)
         self.play(Write(call_rules[0]))
         self.wait()
         for a,b in zip(call_rules,call_rules[1::]):
-            self.play(TransformByGlyphMap(a,b,([],[])))
+            self.play(TransformByGlyphDiff(a,b))
             self.wait()
         self.play(Unwrite(call_rules[-1]))
         self.wait()
@@ -669,21 +672,17 @@ class Algorithm(Scene):
                 r"\frac{\Gamma,f:\tau_x \rightarrow \tau_{\text{ret}},x:\tau_x \vdash e_1 \Leftarrow \tau_{\text{ret}} \qquad \Gamma,f:\tau_x \rightarrow \tau_{\text{ret}} \vdash e_2 \Rightarrow \tau_2}{\Gamma \vdash \text{letfun}~f (x : \tau_x) : \tau_{\text{ret}} \rightarrow e_1~\text{in}~e_2 \Rightarrow \tau_2}(\text{LETFUN})"
             ).scale(0.8),
         ]
-        let_fun_rules[1][0][19].set_color(BLUE)
-        let_fun_rules[2][0][19].set_color(BLUE)
-        let_fun_rules[2][0][38].set_color(RED)
-        let_fun_rules[2][0][69].set_color(RED)
+        for rule in let_fun_rules:
+            color_arrows(rule)
         self.play(Write(let_fun_rules[0]))
         self.wait()
         for a,b in zip(let_fun_rules,let_fun_rules[1::]):
-            self.play(TransformByGlyphMap(a,b,([],[])))
+            self.play(TransformByGlyphDiff(a,b))
             self.wait()
         self.play(Unwrite(let_fun_rules[-1]))
         self.wait()
 
-        check_rule = MathTex(r"\frac{\Gamma \vdash e \Rightarrow \tau_{\text{actual}}}{\Gamma \vdash e \Leftarrow \tau_{\text{expected}}}(\text{CHECK})")
-        check_rule[0][3].set_color(RED)
-        check_rule[0][15].set_color(BLUE)
+        check_rule = color_arrows(MathTex(r"\frac{\Gamma \vdash e \Rightarrow \tau_{\text{actual}}}{\Gamma \vdash e \Leftarrow \tau_{\text{expected}}}(\text{CHECK})"))
         self.play(Write(check_rule))
         self.wait()
         self.play(Unwrite(check_rule))
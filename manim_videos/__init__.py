@@ -0,0 +1,22 @@
+'''shared render tooling for the videos in 2024/*
+
+each video's main.py puts the repo root on sys.path and imports manim_videos.installed,
+which calls install()
+'''
+from manim_videos import (
+    draft, frame_ring, holds, play_keys, point_clouds, profiling, split, static_layer, tex_cache, tex_prefetch,
+)
+
+
+def install():
+    '''hooks the tooling into manim, see manim_videos.installed'''
+    tex_cache.install()
+    tex_prefetch.install()
+    play_keys.install()
+    static_layer.install()
+    point_clouds.install()
+    holds.install()
+    frame_ring.install()
+    profiling.install()
+    draft.install()
+    split.install()
@@ -0,0 +1,227 @@
+'''renders a fixed set of scenes and compares them against a stored baseline
+
+    python -m manim_videos.bench                   # run, compare to benchmarks/baseline.json
+    python -m manim_videos.bench -q l -n 3         # low quality only, median of 3 runs
+    python -m manim_videos.bench --save-baseline   # run and make the results the new baseline
+
+each scene renders in its own manim process with the profiler on, partial
+movie caching off and an empty TeX cache, so every run does the same work. it
+needs no display: manim renders with cairo and nothing is previewed.
+
+per scene and quality this records wall time, peak RSS (from wait4), frames
+written, frames per second and LaTeX compiles, into .cache/bench/latest.json.
+a scene regresses when its time or memory grows by more than --threshold, or
+it compiles more LaTeX than the baseline did.
+'''
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from manim_videos.render import Job
+from manim_videos.scenes import find_video, repo_root
+from manim_videos.tex_cache import cache_root
+
+BENCHMARKS = [
+    ('interpreter', 'Operations'),
+    ('interpreter', 'Testing'),
+    ('type-checker', 'Algorithm'),
+    ('type-checker', 'Rules'),
+    ('polynomial', 'Temp'),
+]
+# -ql, and None for the 1080p60 in each manim.cfg
+BENCH_QUALITIES: list[str | None] = ['l', None]
+
+baseline_file = repo_root / 'benchmarks' / 'baseline.json'
+results_file = cache_root / 'bench' / 'latest.json'
+
+
+@dataclass(frozen=True)
+class Measurement:
+    video: str
+    scene: str
+    quality: str
+    seconds: float
+    peak_rss_mb: float
+    frames: int
+    latex_compiles: int
+    returncode: int
+
+    @property
+    def key(self) -> str:
+        return f'{self.video}/{self.scene}@{self.quality}'
+
+    @property
+    def fps(self) -> float:
+        return self.frames / self.seconds if self.seconds else 0.0
+
+
+def measure(job: Job) -> Measurement:
+    '''one cold render of job'''
+    job.log_file.parent.mkdir(parents=True, exist_ok=True)
+    profile = job.video.media_dir / 'profile' / f'{job.scene}.json'
+    profile.unlink(missing_ok=True)
+    with tempfile.TemporaryDirectory(prefix='bench-cache-') as cache, job.log_file.open('w') as log:
+        env = {**os.environ, 'MANIM_VIDEOS_PROFILE': '1', 'MANIM_VIDEOS_CACHE': cache}
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [*job.command(), '--disable_caching'],
+            cwd=job.video.directory,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            env=env,
+        )
+        # wait4 rather than wait, for the child's resource usage. ru_maxrss is in KiB on linux
+        _, status, usage = os.wait4(process.pid, 0)
+        seconds = time.perf_counter() - start
+        process.returncode = os.waitstatus_to_exitcode(status)
+    try:
+        report = json.loads(profile.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        report = {}
+    return Measurement(
+        video=job.video.name,
+        scene=job.scene,
+        quality=job.quality_folder,
+        seconds=seconds,
+        peak_rss_mb=usage.ru_maxrss / 1024,
+        frames=report.get('frames', 0),
+        latex_compiles=report.get('tex', {}).get('compiles', 0),
+        returncode=process.returncode,
+    )
+
+
+def median_of(job: Job, repeat: int) -> Measurement:
+    '''the median time and the largest peak RSS over repeat runs, which is what's compared
+    against the baseline'''
+    runs = [measure(job) for _ in range(repeat)]
+    failed = [run for run in runs if run.returncode != 0]
+    if failed:
+        return failed[0]
+    return Measurement(**{
+        **asdict(runs[0]),
+        'seconds': statistics.median(run.seconds for run in runs),
+        'peak_rss_mb': max(run.peak_rss_mb for run in runs),
+    })
+
+
+def load(path: Path) -> dict[str, dict]:
+    try:
+        return json.loads(path.read_text())['results']
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        return {}
+
+
+def save(path: Path, measurements: list[Measurement]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'cpus': os.cpu_count(),
+        'results': {
+            measurement.key: {**asdict(measurement), 'fps': measurement.fps}
+            for measurement in measurements
+        },
+    }, indent=2))
+
+
+def regressions(measurement: Measurement, baseline: dict, threshold: float) -> list[str]:
+    found = []
+    if measurement.seconds > baseline['seconds'] * (1 + threshold):
+        found.append(f"time {baseline['seconds']:.1f}s -> {measurement.seconds:.1f}s")
+    if measurement.peak_rss_mb > baseline['peak_rss_mb'] * (1 + threshold):
+        found.append(f"peak RSS {baseline['peak_rss_mb']:.0f}MB -> {measurement.peak_rss_mb:.0f}MB")
+    if measurement.latex_compiles > baseline['latex_compiles']:
+        found.append(f"LaTeX compiles {baseline['latex_compiles']} -> {measurement.latex_compiles}")
+    return found
+
+
+def table(measurements: list[Measurement], baseline: dict[str, dict]) -> str:
+    rows = [('scene', 'quality', 'seconds', 'baseline', 'peak MB', 'frames', 'fps', 'latex')]
+    for measurement in measurements:
+        before = baseline.get(measurement.key)
+        rows.append((
+            f'{measurement.video}/{measurement.scene}',
+            measurement.quality,
+            f'{measurement.seconds:.1f}' if measurement.returncode == 0 else f'exit {measurement.returncode}',
+            f"{before['seconds']:.1f}" if before else '-',
+            f'{measurement.peak_rss_mb:.0f}',
+            str(measurement.frames),
+            f'{measurement.fps:.1f}',
+            str(measurement.latex_compiles),
+        ))
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    return '\n'.join(
+        '  '.join(cell.ljust(width) if i < 2 else cell.rjust(width) for i, (cell, width) in enumerate(zip(row, widths)))
+        for row in rows
+    )
+
+
+def parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m manim_videos.bench', description=__doc__.split('\n')[0])
+    parser.add_argument('-q', '--quality', dest='qualities', action='append', choices=['l', 'cfg'], help='only this quality, l or cfg (repeatable, default: both)')
+    parser.add_argument('-s', '--scene', dest='scenes', action='append', help='only this scene, like interpreter/Operations (repeatable)')
+    parser.add_argument('-n', '--repeat', type=int, default=1, help='runs per scene, reports the median time (default: 1)')
+    parser.add_argument('--threshold', type=float, default=0.10, help='allowed slowdown or memory growth (default: 0.10)')
+    parser.add_argument('--baseline', type=Path, default=baseline_file, help=f'baseline file (default: {baseline_file.relative_to(repo_root)})')
+    parser.add_argument('--save-baseline', action='store_true', help='write the results to the baseline file')
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parser().parse_args(argv)
+    qualities = [None if quality == 'cfg' else quality for quality in args.qualities] if args.qualities else BENCH_QUALITIES
+    jobs = [
+        Job(find_video(video), scene, quality)
+        for quality in qualities
+        for video, scene in BENCHMARKS
+        if not args.scenes or f'{video}/{scene}' in args.scenes
+    ]
+    if not jobs:
+        print('nothing to benchmark')
+        return 1
+    measurements = []
+    for job in jobs:
+        print(f'{job.video.name}/{job.scene} @ {job.quality_folder}...', flush=True)
+        measurements.append(median_of(job, args.repeat))
+    save(results_file, measurements)
+    baseline = load(args.baseline)
+    print()
+    print(table(measurements, baseline))
+    print(f'\nresults written to {results_file}')
+
+    failed = [measurement for measurement in measurements if measurement.returncode != 0]
+    for measurement in failed:
+        print(f'{measurement.key}: render failed, see {find_video(measurement.video).media_dir / "render-logs"}')
+    if args.save_baseline:
+        if failed:
+            print('not saving a baseline with failed renders')
+            return 1
+        save(args.baseline, measurements)
+        print(f'baseline written to {args.baseline}')
+        return 0
+    if not baseline:
+        print(f'no baseline at {args.baseline}, run with --save-baseline to make one')
+        return 1 if failed else 0
+
+    regressed = False
+    for measurement in measurements:
+        if measurement.key not in baseline:
+            print(f'{measurement.key}: not in the baseline')
+        elif measurement.returncode == 0:
+            for regression in regressions(measurement, baseline[measurement.key], args.threshold):
+                print(f'REGRESSION {measurement.key}: {regression}')
+                regressed = True
+    return 1 if regressed or failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
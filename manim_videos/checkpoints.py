@@ -0,0 +1,133 @@
+'''scenes that can be rendered from a named section on, without running the ones before it.
+
+a CheckpointScene's construct runs its section methods in order:
+
+    class Operations(CheckpointScene):
+        sections = ('title', 'addition', ..., 'short_circuit', 'negation')
+
+        def title(self):
+            ...
+
+before each section runs, what's on screen (the scene's mobjects and
+foreground mobjects, and a moving camera's frame) is pickled into
+media/checkpoints/<Scene>/<section>.pickle. with MANIM_VIDEOS_RESUME=<section>
+(render.py --resume <section>), the scene loads that checkpoint and runs only
+that section and the ones after it, so none of the earlier construct code,
+TeX or animations run. the movie goes to <Scene>_from_<section>.mp4 and the
+full render stays as it was.
+
+a checkpoint is keyed by the code of the sections before it, the helpers
+they use and the local_path files they load. resuming from a stale or
+missing checkpoint renders the whole scene instead, and says so. sections
+should only hand each other what's on screen, attributes set on self
+aren't saved.
+'''
+from __future__ import annotations
+
+import ast
+import hashlib
+import os
+import pickle
+import sys
+from pathlib import Path
+
+from manim import Scene, config
+
+from manim_videos.fingerprint import closure, file_digest, local_paths
+
+
+def resume_section() -> str | None:
+    return os.environ.get('MANIM_VIDEOS_RESUME') or None
+
+
+def code_before(scene_class: type, tree: ast.Module, section: str) -> list[ast.AST]:
+    '''the sections before section, the scene's other methods and its base classes in the
+    file. not the sections from section on, editing those doesn't change what's on screen
+    when it starts'''
+    later = set(scene_class.sections[scene_class.sections.index(section):])
+    classes = {node.name: node for node in tree.body if isinstance(node, ast.ClassDef)}
+    scene_node = classes[scene_class.__name__]
+    nodes: list[ast.AST] = [
+        node for node in scene_node.body
+        if not (isinstance(node, ast.FunctionDef) and node.name in later)
+    ]
+    nodes += [classes[cls.__name__] for cls in scene_class.__mro__[1:] if cls.__name__ in classes]
+    return nodes
+
+
+def section_key(scene_class: type, section: str) -> str:
+    '''changes whenever the code that runs before section does'''
+    module_file = Path(sys.modules[scene_class.__module__].__file__)
+    source = module_file.read_text()
+    tree = ast.parse(source, filename=str(module_file))
+    nodes = closure(tree, code_before(scene_class, tree, section))
+    hasher = hashlib.sha256(scene_class.__name__.encode())
+    for node in nodes:
+        hasher.update((ast.get_source_segment(source, node) or ast.dump(node)).encode())
+    for path in local_paths(nodes):
+        hasher.update(f'{path}\0{file_digest(module_file.parent / path)}'.encode())
+    return hasher.hexdigest()
+
+
+class CheckpointScene(Scene):
+    '''a scene whose construct is its sections, see the module docstring'''
+    sections: tuple[str, ...] = ()
+
+    def checkpoint_file(self, section: str) -> Path:
+        return Path(config.get_dir('media_dir')) / 'checkpoints' / type(self).__name__ / f'{section}.pickle'
+
+    def save_checkpoint(self, section: str):
+        frame = getattr(self.renderer.camera, 'frame', None)
+        state = {
+            'key': section_key(type(self), section),
+            'mobjects': self.mobjects,
+            'foreground': self.foreground_mobjects,
+            'frame': frame,
+        }
+        path = self.checkpoint_file(section)
+        try:
+            data = pickle.dumps(state)
+        except (pickle.PicklingError, TypeError, AttributeError) as error:
+            # updaters are usually lambdas, which don't pickle
+            print(f'no checkpoint for {section}, the scene would not pickle: {error}')
+            path.unlink(missing_ok=True)
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_suffix(f'.{os.getpid()}.tmp')
+        temporary.write_bytes(data)
+        os.replace(temporary, path)
+
+    def load_checkpoint(self, section: str) -> bool:
+        '''puts what was on screen before section back, False if there's no up to date checkpoint'''
+        try:
+            state = pickle.loads(self.checkpoint_file(section).read_bytes())
+        except (FileNotFoundError, pickle.UnpicklingError, EOFError, AttributeError):
+            return False
+        if state['key'] != section_key(type(self), section):
+            return False
+        self.add(*state['mobjects'])
+        self.add_foreground_mobjects(*state['foreground'])
+        frame = getattr(self.renderer.camera, 'frame', None)
+        if frame is not None and state['frame'] is not None:
+            frame.become(state['frame'])
+        return True
+
+    def construct(self):
+        resume = resume_section()
+        start = 0
+        resumed = False
+        if resume is not None:
+            if resume not in self.sections:
+                raise ValueError(f'{type(self).__name__} has no section {resume!r}, only {", ".join(self.sections)}')
+            if self.load_checkpoint(resume):
+                start = self.sections.index(resume)
+                resumed = True
+                # before the first play, so every partial movie goes under the new name
+                self.renderer.file_writer.init_output_directories(f'{type(self).__name__}_from_{resume}')
+            else:
+                print(f'no up to date checkpoint for {resume}, rendering all of {type(self).__name__}')
+        for section in self.sections[start:]:
+            # the checkpoint just loaded is already up to date
+            if not (resumed and section == resume):
+                self.save_checkpoint(section)
+            getattr(self, section)()
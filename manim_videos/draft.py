@@ -0,0 +1,135 @@
+'''draft renders: keyframes only, turned on by MANIM_VIDEOS_DRAFT=1 (or render.py --draft).
+
+the scene code runs unchanged, but each play() draws two frames, where its
+animations start and where they end, and each wait() draws one. every
+keyframe is held for half a second, so the movie is a slideshow of the
+scene. the keyframes also go into a contact sheet, <media_dir>/draft/<Scene>.png,
+labelled with the play number and the main.py line it came from.
+
+drafts are written as <Scene>_draft.mp4 with their own partial movies, so
+they never mix with full renders.
+'''
+from __future__ import annotations
+
+import functools
+import math
+import os
+from pathlib import Path
+
+from manim_videos.profiling import call_lines
+
+HOLD_SECONDS = 0.5
+THUMBNAIL_WIDTH = 384
+COLUMNS = 6
+
+
+def enabled() -> bool:
+    return os.environ.get('MANIM_VIDEOS_DRAFT', '') not in ('', '0')
+
+
+class ContactSheet:
+    '''thumbnails of a scene's keyframes, in order'''
+
+    def __init__(self):
+        self.frames: list[tuple[str, object]] = []
+
+    def add(self, label: str, image):
+        height = round(image.height * THUMBNAIL_WIDTH / image.width)
+        self.frames.append((label, image.convert('RGB').resize((THUMBNAIL_WIDTH, height))))
+
+    def save(self, path: Path):
+        from PIL import Image, ImageDraw
+
+        if not self.frames:
+            return
+        label_height = 16
+        cell_height = max(image.height for _, image in self.frames) + label_height
+        rows = math.ceil(len(self.frames) / COLUMNS)
+        sheet = Image.new('RGB', (COLUMNS * THUMBNAIL_WIDTH, rows * cell_height), 'white')
+        draw = ImageDraw.Draw(sheet)
+        for i, (label, image) in enumerate(self.frames):
+            x = (i % COLUMNS) * THUMBNAIL_WIDTH
+            y = (i // COLUMNS) * cell_height
+            sheet.paste(image, (x, y + label_height))
+            draw.text((x + 4, y + 2), label, fill='black')
+        path.parent.mkdir(parents=True, exist_ok=True)
+        sheet.save(path)
+
+
+def keyframe(scene, label: str):
+    '''draws the scene once, holds it in the movie and adds it to the contact sheet'''
+    renderer = scene.renderer
+    renderer.update_frame(scene, scene.moving_mobjects)
+    frame = renderer.get_frame()
+    renderer.add_frame(frame, num_frames=max(1, round(renderer.camera.frame_rate * HOLD_SECONDS)))
+    lines = call_lines(scene)
+    where = f' line {lines[-1]}' if lines else ''
+    scene.contact_sheet.add(f'#{renderer.num_plays} {label}{where}', renderer.camera.get_image(frame))
+
+
+def install():
+    if not enabled():
+        return
+    from manim import Scene, Wait, config
+    from manim.renderer.cairo_renderer import CairoRenderer
+    from manim.scene.scene_file_writer import SceneFileWriter
+
+    if getattr(Scene.play_internal, 'draft', False):
+        return
+
+    def play_internal(self, skip_rendering=False):
+        self.duration = self.get_run_time(self.animations)
+        waiting = all(isinstance(animation, Wait) for animation in self.animations)
+        # jumping straight to the end runs updaters once, with the whole run time as dt
+        times = [('wait', self.duration)] if waiting else [('start', 0), ('end', self.duration)]
+        for label, t in times:
+            self.update_to_time(t)
+            if not skip_rendering and not self.skip_animation_preview:
+                keyframe(self, label)
+        for animation in self.animations:
+            animation.finish()
+            animation.clean_up_from_scene(self)
+        if not self.renderer.skip_animations:
+            self.update_mobjects(0)
+        self.renderer.static_image = None
+
+    play_internal.draft = True
+    Scene.play_internal = play_internal
+
+    def freeze_current_frame(self, duration):
+        # static waits. the frame was already drawn by play()
+        keyframe(self.scene, 'wait')
+
+    CairoRenderer.freeze_current_frame = freeze_current_frame
+
+    init_scene = CairoRenderer.init_scene
+
+    @functools.wraps(init_scene)
+    def draft_init_scene(self, scene):
+        # keyframe needs the scene, which freeze_current_frame isn't given
+        self.scene = scene
+        scene.contact_sheet = ContactSheet()
+        return init_scene(self, scene)
+
+    CairoRenderer.init_scene = draft_init_scene
+
+    init_output_directories = SceneFileWriter.init_output_directories
+
+    @functools.wraps(init_output_directories)
+    def draft_output_directories(self, scene_name):
+        return init_output_directories(self, f'{scene_name}_draft')
+
+    SceneFileWriter.init_output_directories = draft_output_directories
+
+    render = Scene.render
+
+    @functools.wraps(render)
+    def draft_render(self, *args, **kwargs):
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            path = Path(config.get_dir('media_dir')) / 'draft' / f'{type(self).__name__}.png'
+            self.contact_sheet.save(path)
+            print(f'contact sheet written to {path}')
+
+    Scene.render = draft_render
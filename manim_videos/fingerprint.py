@@ -0,0 +1,161 @@
+'''source fingerprints for scenes, so unchanged scenes don't have to be re-rendered.
+
+a scene's fingerprint covers everything its output depends on that lives in
+this repo:
+- the scene class and, transitively, every top-level definition it refers
+  to (base classes like InterpreterScene, helpers like EvalTex and
+  eval_colors, module globals like rules and monospace)
+- the files it loads through local_path('...')
+- the video's manim.cfg, the quality it's rendered at and requirements.txt
+- the manim_videos modules main.py imports, since they hook into rendering,
+  and the modules next to main.py it imports, like polynomial/polynomials.py
+'''
+from __future__ import annotations
+
+import ast
+import hashlib
+import json
+from pathlib import Path
+
+from manim_videos.scenes import Video, repo_root
+
+
+def bound_names(node: ast.stmt) -> set[str]:
+    '''names a top-level statement defines'''
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return {node.name}
+    names = set()
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Store):
+            names.add(child.id)
+        elif isinstance(child, ast.alias):
+            names.add((child.asname or child.name).split('.')[0])
+    return names
+
+
+def referenced_names(node: ast.AST) -> set[str]:
+    return {child.id for child in ast.walk(node) if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Load)}
+
+
+def closure(tree: ast.Module, roots: list[ast.AST]) -> list[ast.AST]:
+    '''roots and every top-level statement they transitively refer to, in file order'''
+    definitions: dict[str, list[ast.stmt]] = {}
+    for node in tree.body:
+        for name in bound_names(node):
+            definitions.setdefault(name, []).append(node)
+    seen = {id(root): root for root in roots}
+    todo = list(roots)
+    while todo:
+        for name in referenced_names(todo.pop()):
+            for node in definitions.get(name, []):
+                if id(node) not in seen:
+                    seen[id(node)] = node
+                    todo.append(node)
+    return sorted(seen.values(), key=lambda node: node.lineno)
+
+
+def dependencies(tree: ast.Module, scene: str) -> list[ast.stmt]:
+    '''the scene's class and every top-level statement it transitively refers to, in file order'''
+    roots = [node for node in tree.body if isinstance(node, ast.ClassDef) and node.name == scene]
+    if not roots:
+        raise ValueError(f'no scene named {scene}')
+    return closure(tree, roots[:1])
+
+
+def local_path_calls(nodes: list[ast.stmt]) -> list[ast.Call]:
+    '''local_path(...) calls with a string literal, in the order they're found'''
+    calls = []
+    for node in nodes:
+        for child in ast.walk(node):
+            if (
+                isinstance(child, ast.Call)
+                and isinstance(child.func, ast.Name)
+                and child.func.id == 'local_path'
+                and child.args
+                and isinstance(child.args[0], ast.Constant)
+                and isinstance(child.args[0].value, str)
+            ):
+                calls.append(child)
+    return calls
+
+
+def local_paths(nodes: list[ast.stmt]) -> list[str]:
+    '''string literals passed to local_path(...)'''
+    return [call.args[0].value for call in local_path_calls(nodes)]
+
+
+def imported_sources(tree: ast.Module, directory: Path) -> list[Path]:
+    '''manim_videos source files a module imports, and the modules from directory it imports, transitively'''
+    package = repo_root / 'manim_videos'
+    files: list[Path] = []
+    todo = [tree]
+    while todo:
+        for node in ast.walk(todo.pop()):
+            if isinstance(node, ast.Import):
+                modules = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module:
+                modules = [node.module, *(f'{node.module}.{alias.name}' for alias in node.names)]
+            else:
+                continue
+            for module in modules:
+                parts = module.split('.')
+                # main.py's directory is on sys.path when manim runs it
+                path = package.joinpath(*parts[1:]) if parts[0] == 'manim_videos' else directory.joinpath(*parts)
+                for candidate in (path / '__init__.py', path.with_suffix('.py')):
+                    if candidate.is_file() and candidate not in files:
+                        files.append(candidate)
+                        todo.append(ast.parse(candidate.read_text(), filename=str(candidate)))
+    return sorted(files)
+
+
+def file_digest(path: Path) -> str:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return 'missing'
+
+
+def scene_fingerprint(video: Video, scene: str, quality: str | None) -> str:
+    source = video.main_py.read_text()
+    tree = ast.parse(source, filename=str(video.main_py))
+    nodes = dependencies(tree, scene)
+    hasher = hashlib.sha256()
+
+    def add(*parts: str):
+        for part in parts:
+            hasher.update(part.encode())
+            hasher.update(b'\0')
+
+    add(scene, quality or 'manim.cfg')
+    for node in nodes:
+        add(ast.get_source_segment(source, node) or ast.dump(node))
+    for path in local_paths(nodes):
+        add(path, file_digest(video.directory / path))
+    for path in [video.config_file, repo_root / 'requirements.txt', *imported_sources(tree, video.directory)]:
+        add(str(path.relative_to(repo_root)), file_digest(path))
+    return hasher.hexdigest()
+
+
+class Manifest:
+    '''fingerprints of the last successful render of each scene, per video'''
+
+    def __init__(self, video: Video):
+        self.path = video.media_dir / 'build-manifest.json'
+        try:
+            self.fingerprints: dict[str, str] = json.loads(self.path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.fingerprints = {}
+
+    @staticmethod
+    def key(scene: str, quality: str | None) -> str:
+        return f'{scene}@{quality or "manim.cfg"}'
+
+    def get(self, scene: str, quality: str | None) -> str | None:
+        return self.fingerprints.get(self.key(scene, quality))
+
+    def set(self, scene: str, quality: str | None, fingerprint: str):
+        self.fingerprints[self.key(scene, quality)] = fingerprint
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.fingerprints, indent=2, sort_keys=True))
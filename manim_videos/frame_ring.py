@@ -0,0 +1,103 @@
+'''hands rendered frames to the encoder through a fixed ring of buffers.
+
+manim's cairo renderer already encodes on a writer thread, but every frame
+is a fresh copy of the camera's pixels (8MB at 1080p) put on an unbounded
+queue. when x264 falls behind, a long 1080p60 scene like Operations piles
+up frames until it runs out of memory, and the allocations cost as much as
+the copy.
+
+here the movie writer owns a ring of preallocated frame arrays. a rendered
+frame is copied straight from the camera into a free one, and that array
+itself is what the writer thread encodes, then gives back. when all of
+them are waiting to be encoded, rendering waits for the encoder, so memory
+stays at MANIM_VIDEOS_FRAME_RING frames (default 8). pycairo and pyav both
+let go of the GIL while they work, so rasterizing one frame and encoding
+the ones before it happen on separate cores.
+
+MANIM_VIDEOS_FRAME_RING=0 turns this off.
+'''
+from __future__ import annotations
+
+import functools
+import os
+import queue
+
+import numpy as np
+
+
+def ring_size() -> int:
+    return int(os.environ.get('MANIM_VIDEOS_FRAME_RING', '8') or 0)
+
+
+class FrameRing:
+    '''preallocated frame arrays, lent out one at a time and given back after encoding'''
+    def __init__(self, size: int, shape: tuple, dtype):
+        self.shape = shape
+        self.dtype = dtype
+        self.free: queue.Queue[np.ndarray] = queue.Queue()
+        for _ in range(size):
+            self.free.put(np.empty(shape, dtype=dtype))
+
+    def fits(self, frame: np.ndarray) -> bool:
+        return frame.shape == self.shape and frame.dtype == self.dtype
+
+    def acquire(self) -> np.ndarray:
+        '''a free array, waiting for the encoder to give one back if there's none'''
+        return self.free.get()
+
+    def release(self, frame: np.ndarray):
+        self.free.put(frame)
+
+
+def install():
+    from manim.renderer.cairo_renderer import CairoRenderer
+    from manim.scene.scene_file_writer import SceneFileWriter
+
+    size = ring_size()
+    if size <= 0 or getattr(SceneFileWriter.write_frame, 'frame_ring', False):
+        return
+    write_frame = SceneFileWriter.write_frame
+    listen_and_write = SceneFileWriter.listen_and_write
+
+    def encoding(writer) -> bool:
+        thread = getattr(writer, 'writer_thread', None)
+        return thread is not None and thread.is_alive()
+
+    @functools.wraps(write_frame)
+    def ring_write_frame(self, frame_or_renderer, num_frames=1):
+        if not isinstance(frame_or_renderer, np.ndarray) or not encoding(self):
+            return write_frame(self, frame_or_renderer, num_frames)
+        ring = getattr(self, 'frame_ring', None)
+        if ring is None or not ring.fits(frame_or_renderer):
+            ring = self.frame_ring = FrameRing(size, frame_or_renderer.shape, frame_or_renderer.dtype)
+        frame = ring.acquire()
+        np.copyto(frame, frame_or_renderer)
+        # the writer thread gives it back once it's encoded, see ring_listen_and_write
+        frame.flags.writeable = False
+        return write_frame(self, frame, num_frames)
+
+    @functools.wraps(listen_and_write)
+    def ring_listen_and_write(self):
+        while True:
+            num_frames, frame_data = self.queue.get()
+            if frame_data is None:
+                break
+            try:
+                self.encode_and_write_frame(frame_data, num_frames)
+            finally:
+                ring = getattr(self, 'frame_ring', None)
+                if ring is not None and not frame_data.flags.writeable and ring.fits(frame_data):
+                    frame_data.flags.writeable = True
+                    ring.release(frame_data)
+
+    def ring_render(self, scene, time, moving_mobjects):
+        self.update_frame(scene, moving_mobjects)
+        # no copy while encoding, write_frame copies the camera's pixels into the ring. without
+        # the writer thread manim's write_frame keeps the array, so it gets its own, as in manim
+        frame = self.camera.pixel_array if encoding(self.file_writer) else self.get_frame()
+        self.add_frame(frame)
+
+    ring_write_frame.frame_ring = True
+    SceneFileWriter.write_frame = ring_write_frame
+    SceneFileWriter.listen_and_write = ring_listen_and_write
+    CairoRenderer.render = functools.wraps(CairoRenderer.render)(ring_render)
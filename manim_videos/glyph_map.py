@@ -0,0 +1,160 @@
+'''glyph maps for MF_Tools' TransformByGlyphMap, computed from what the glyphs look like.
+
+TransformByGlyphMap(a, b, *entries) needs (from indices, to indices) entries
+for every glyph that doesn't just move to the same place in order. writing
+them by hand means counting glyphs, and any TeX edit shifts the counts.
+
+here each glyph is reduced to a hash of its outline (relative to its own
+center, at a fixed font size, ignoring color, to within a thousandth of the
+glyph's size, so small glyphs are told apart as well as big ones) and its
+size, and the two formulas' glyph
+hash sequences are diffed. glyphs in unchanged runs are paired one to one,
+changed runs morph into each other, and inserted and deleted runs fade in and
+out. TransformByGlyphDiff(a, b) plays that, with any hand written entries
+taking precedence over the computed ones.
+
+glyphs(tex, r'\\tau_{\\text{ret}}') finds a piece of a formula the same way, by
+compiling the piece on its own (through the TeX cache) and searching for its
+glyphs, so Circumscribe(glyphs(...)) keeps pointing at the right thing after
+the formula changes.
+
+results are memoized per process and on disk next to the TeX cache, keyed by
+the glyph hashes, so a formula is diffed once and looked up after that.
+'''
+from __future__ import annotations
+
+import difflib
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from manim_videos.tex_cache import cache_root
+
+maps_dir = cache_root / 'glyph-maps'
+
+# in-process memo of everything computed or read from maps_dir
+_memo: dict[str, object] = {}
+
+# outlines are hashed to within this fraction of the glyph's size
+PRECISION = 1e-3
+
+
+def glyph_hash(glyph, font_size: float) -> str:
+    '''hash of a glyph's outline, the same wherever it is in a formula and whatever its color'''
+    points = np.asarray(glyph.points)
+    hasher = hashlib.sha256(type(glyph).__name__.encode())
+    hasher.update(str(points.shape).encode())
+    if len(points):
+        points = (points - glyph.get_center()) * (48 / font_size)
+        size = float(np.ptp(points, axis=0).max())
+        if size > 0:
+            # the outline's shape in steps of PRECISION, and its size to the same precision at 48pt
+            hasher.update(f'{size:.3f}'.encode())
+            points = points / (size * PRECISION)
+        hasher.update((np.round(points) + 0.0).tobytes())
+    return hasher.hexdigest()[:16]
+
+
+def glyph_hashes(tex, submobject_index: int = 0) -> list[str]:
+    '''glyph hashes of tex[submobject_index], the part TransformByGlyphMap indexes into'''
+    return [glyph_hash(glyph, tex.font_size) for glyph in tex[submobject_index]]
+
+
+def _cached(kind: str, inputs: list, compute):
+    key = hashlib.sha256(json.dumps([kind, inputs]).encode()).hexdigest()[:32]
+    if key in _memo:
+        return _memo[key]
+    path = maps_dir / key[:2] / f'{key}.json'
+    try:
+        value = json.loads(path.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        value = compute()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_suffix(f'.{os.getpid()}.tmp')
+        temporary.write_text(json.dumps(value))
+        os.replace(temporary, path)
+    _memo[key] = value
+    return value
+
+
+def diff_entries(before: list[str], after: list[str]) -> list[tuple[list[int], list[int]]]:
+    '''glyph map entries turning the glyph sequence before into after, mentioning every index'''
+    entries = []
+    matcher = difflib.SequenceMatcher(None, before, after, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal' or (tag == 'replace' and i2 - i1 == j2 - j1):
+            entries += [([i], [j]) for i, j in zip(range(i1, i2), range(j1, j2))]
+        else:
+            entries.append((list(range(i1, i2)), list(range(j1, j2))))
+    return entries
+
+
+def glyph_map(a, b, submobject_index: int = 0) -> list[tuple[list[int], list[int]]]:
+    '''computed TransformByGlyphMap entries from a to b'''
+    before, after = glyph_hashes(a, submobject_index), glyph_hashes(b, submobject_index)
+    entries = _cached('map', [before, after], lambda: diff_entries(before, after))
+    return [(list(from_), list(to)) for from_, to in entries]
+
+
+def merge(computed: list, overrides: tuple) -> list:
+    '''overrides, then the computed entries for glyphs they don't mention'''
+    taken_from = {i for entry in overrides for i in entry[0]}
+    taken_to = {j for entry in overrides for j in entry[1]}
+    merged = list(overrides)
+    for from_, to in computed:
+        from_ = [i for i in from_ if i not in taken_from]
+        to = [j for j in to if j not in taken_to]
+        if from_ or to:
+            merged.append((from_, to))
+    return merged
+
+
+def TransformByGlyphDiff(a, b, *overrides, submobject_index: int = 0, **kwargs):
+    '''TransformByGlyphMap(a, b, ...) with the glyph map computed by diffing a and b'''
+    from MF_Tools import TransformByGlyphMap
+
+    entries = merge(glyph_map(a, b, submobject_index), overrides)
+    return TransformByGlyphMap(
+        a, b, *entries,
+        mobA_submobject_index=[submobject_index],
+        mobB_submobject_index=[submobject_index],
+        **kwargs,
+    )
+
+
+def _piece_hashes(tex, piece: str) -> list[str]:
+    from manim import MathTex
+
+    # compiled at the formula's font size and template, so matching glyphs hash the same
+    compiled = MathTex(piece, tex_template=tex.tex_template, font_size=tex.font_size)
+    return glyph_hashes(compiled)
+
+
+def glyph_ranges(tex, piece: str, submobject_index: int = 0) -> list[slice]:
+    '''every place the glyphs of the TeX piece are in tex[submobject_index], as slices, in order'''
+    hashes = glyph_hashes(tex, submobject_index)
+
+    def find():
+        # only compiled the first time a formula is searched for the piece
+        wanted = _piece_hashes(tex, piece)
+        return [
+            (start, start + len(wanted)) for start in range(len(hashes) - len(wanted) + 1)
+            if hashes[start:start + len(wanted)] == wanted
+        ]
+
+    return [slice(start, stop) for start, stop in _cached('piece', [hashes, piece], find)]
+
+
+def glyph_range(tex, piece: str, occurrence: int = 0, submobject_index: int = 0) -> slice:
+    '''where the glyphs of the TeX piece are in tex[submobject_index], as a slice'''
+    ranges = glyph_ranges(tex, piece, submobject_index)
+    if occurrence >= len(ranges):
+        raise ValueError(f'{piece!r} occurs {len(ranges)} times in {tex.tex_string!r}, wanted occurrence {occurrence}')
+    return ranges[occurrence]
+
+
+def glyphs(tex, piece: str, occurrence: int = 0, submobject_index: int = 0):
+    '''the glyphs of a TeX piece inside tex, like tex[0][a:b] without counting a and b'''
+    return tex[submobject_index][glyph_range(tex, piece, occurrence, submobject_index)]
@@ -0,0 +1,119 @@
+'''cheaper encoding for frames held on screen, like a static self.wait(1).
+
+manim already draws a wait with no updaters once, but then hands the frame
+to the encoder once per frame of the wait, and x264 codes every repeat. at
+60fps that's 60 conversions and encodes of the same picture per second of
+waiting.
+
+a wait is its own play, so its partial movie is nothing but the held frame.
+there the frame is encoded once, as a keyframe, and that packet is muxed
+again for every frame of the hold with its timestamps moved on, like
+split.stitch does with whole movies. a hold then costs about one frame to
+render, and the movie keeps a constant frame rate, which editors and manim's
+gif output want. what it costs instead is file size: every frame of the hold
+is a full keyframe, about 18kB at 1080p for a screen of formulas against
+under 1kB for the repeats x264 codes itself, so a second of waiting is
+about 1MB of movie instead of about 40kB.
+
+holds inside a partial movie with other frames (draft keyframes) and
+formats other than x264 can't be copied like that. those are converted from
+rgba to the movie's pixel format once, and the encoder gets plain copies of
+the converted planes, which is about half the cost of encoding them as
+usual.
+
+MANIM_VIDEOS_HOLDS=convert only converts once, for smaller movies.
+MANIM_VIDEOS_HOLDS=0 turns this off.
+'''
+from __future__ import annotations
+
+import functools
+import os
+
+
+def mode() -> str:
+    '''copy (the default), convert, or off'''
+    value = os.environ.get('MANIM_VIDEOS_HOLDS', '1')
+    if value in ('', '0'):
+        return 'off'
+    return 'convert' if value == 'convert' else 'copy'
+
+
+def converted(frame, pix_fmt: str):
+    '''an rgba pixel array as the planes of a pix_fmt frame, None if pyav can't do that'''
+    import av
+
+    try:
+        return av.VideoFrame.from_ndarray(frame, format='rgba').reformat(format=pix_fmt).to_ndarray()
+    except (ValueError, TypeError):
+        return None
+
+
+def copy_hold(stream, container, frame, num_frames: int):
+    '''encodes frame once, the stream's only frame, and muxes its packet num_frames times.
+    this flushes the encoder, so nothing else can be encoded on the stream'''
+    import av
+
+    packet, = [*stream.encode(av.VideoFrame.from_ndarray(frame, format='rgba')), *stream.encode(None)]
+    step = packet.duration or round(1 / (stream.codec_context.framerate * packet.time_base))
+    data = bytes(packet)
+    for index in range(num_frames):
+        copy = av.Packet(data)
+        copy.pts = copy.dts = packet.pts + index * step
+        copy.duration = step
+        copy.time_base = packet.time_base
+        copy.is_keyframe = True
+        copy.stream = stream
+        container.mux(copy)
+
+
+def install():
+    from manim.renderer.cairo_renderer import CairoRenderer
+    from manim.scene.scene_file_writer import SceneFileWriter
+
+    holds = mode()
+    if holds == 'off' or getattr(SceneFileWriter.encode_and_write_frame, 'holds', False):
+        return
+    encode_and_write_frame = SceneFileWriter.encode_and_write_frame
+    close_partial_movie_stream = SceneFileWriter.close_partial_movie_stream
+    freeze_current_frame = CairoRenderer.freeze_current_frame
+
+    @functools.wraps(freeze_current_frame)
+    def hold_freeze_current_frame(self, duration):
+        # a frozen frame play writes this one frame and nothing else into the stream it opened
+        self.file_writer.whole_hold = getattr(self.file_writer, 'video_stream', None)
+        return freeze_current_frame(self, duration)
+
+    @functools.wraps(encode_and_write_frame)
+    def hold_encode_and_write_frame(self, frame, num_frames):
+        if num_frames <= 1:
+            return encode_and_write_frame(self, frame, num_frames)
+        import av
+
+        stream = self.video_stream
+        if holds == 'copy' and getattr(self, 'whole_hold', None) is stream and stream.codec_context.name == 'libx264':
+            copy_hold(stream, self.video_container, frame, num_frames)
+            self.hold_flushed = stream
+            return
+        pix_fmt = stream.pix_fmt
+        planes = converted(frame, pix_fmt)
+        if planes is None:
+            return encode_and_write_frame(self, frame, num_frames)
+        for _ in range(num_frames):
+            # a new frame each time, the encoder may still hold on to the last one
+            held = av.VideoFrame.from_ndarray(planes, format=pix_fmt)
+            for packet in stream.encode(held):
+                self.video_container.mux(packet)
+
+    @functools.wraps(close_partial_movie_stream)
+    def hold_close_partial_movie_stream(self):
+        if getattr(self, 'hold_flushed', None) is not self.video_stream:
+            return close_partial_movie_stream(self)
+        # manim's close flushes the encoder again, which pyav refuses once it's flushed
+        self.queue.put((-1, None))
+        self.writer_thread.join()
+        self.video_container.close()
+
+    hold_encode_and_write_frame.holds = True
+    SceneFileWriter.encode_and_write_frame = hold_encode_and_write_frame
+    SceneFileWriter.close_partial_movie_stream = hold_close_partial_movie_stream
+    CairoRenderer.freeze_current_frame = hold_freeze_current_frame
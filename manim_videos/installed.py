@@ -0,0 +1,11 @@
+'''importing this hooks the tooling into manim, see install(). a video's main.py starts with
+
+    sys.path.insert(0, os.path.join(script_dir, '..', '..'))
+    import manim_videos.installed
+
+manim only puts main.py's own directory on sys.path, so the repo root has to be added
+before the import.
+'''
+from manim_videos import install
+
+install()
@@ -0,0 +1,105 @@
+'''content-derived partial movie keys for play() calls.
+
+manim names each play()'s partial movie file after a hash of the camera, the
+animations and every mobject in the scene, and reuses the file when a later
+run computes the same hash. that hash serializes whole mobjects (ids and all),
+so it often changes for plays that look exactly the same.
+
+inside keyed(scene, ...), play() and wait() hash only what ends up on screen:
+the given parts, the geometry and colors of the scene's mobjects, the
+animation types and timings, and the camera settings. unchanged plays then
+reuse their partial movie and only edited ones are rendered and encoded.
+'''
+from __future__ import annotations
+
+import hashlib
+from contextlib import contextmanager
+
+import numpy as np
+
+# attributes that decide how a mobject is drawn
+_drawn_arrays = ('points', 'fill_rgbas', 'stroke_rgbas', 'background_stroke_rgbas', 'pixel_array')
+_drawn_values = ('stroke_width', 'background_stroke_width', 'z_index')
+
+
+def _update_array(hasher, array):
+    array = np.asarray(array)
+    if array.dtype.kind == 'f':
+        # adding 0.0 turns -0.0 into 0.0, which would hash differently
+        array = np.round(array, 4) + 0.0
+    hasher.update(str(array.shape).encode())
+    hasher.update(np.ascontiguousarray(array).tobytes())
+
+
+def content_hash(*mobjects, hasher=None) -> str:
+    '''hash of how mobjects look, stable across runs'''
+    hasher = hasher or hashlib.sha256()
+    for mobject in mobjects:
+        for member in mobject.get_family():
+            hasher.update(type(member).__name__.encode())
+            for name in _drawn_arrays:
+                if getattr(member, name, None) is not None:
+                    _update_array(hasher, getattr(member, name))
+            for name in _drawn_values:
+                hasher.update(repr(getattr(member, name, None)).encode())
+    return hasher.hexdigest()
+
+
+def _animation_signature(animation) -> str:
+    rate_func = getattr(animation, 'rate_func', None)
+    parts = [
+        type(animation).__name__,
+        repr(round(animation.get_run_time(), 6)),
+        getattr(rate_func, '__name__', repr(rate_func)),
+        repr(getattr(animation, 'lag_ratio', None)),
+    ]
+    parts += [_animation_signature(child) for child in getattr(animation, 'animations', [])]
+    return '(' + ','.join(parts) + ')'
+
+
+def _camera_signature(camera) -> str:
+    names = (
+        'pixel_width', 'pixel_height', 'frame_rate', 'frame_width', 'frame_height',
+        'frame_center', 'background_color', 'background_opacity',
+    )
+    return repr([str(getattr(camera, name, None)) for name in names])
+
+
+def play_key(scene, camera, animations, mobjects) -> str:
+    hasher = hashlib.sha256()
+    for part in scene.play_key_parts:
+        hasher.update(repr(part).encode())
+    hasher.update(_camera_signature(camera).encode())
+    for animation in animations:
+        hasher.update(_animation_signature(animation).encode())
+    content_hash(*mobjects, hasher=hasher)
+    return f'keyed_{hasher.hexdigest()[:32]}'
+
+
+@contextmanager
+def keyed(scene, *parts):
+    '''plays inside are cached by parts and what's on screen, instead of by manim's hash.
+
+    parts should describe whatever the on-screen content doesn't, like what
+    the animation transforms into and how parts are matched up.
+    '''
+    previous = getattr(scene, 'play_key_parts', None)
+    scene.play_key_parts = parts
+    try:
+        yield
+    finally:
+        scene.play_key_parts = previous
+
+
+def install():
+    from manim.renderer import cairo_renderer
+
+    manim_hash = getattr(cairo_renderer.get_hash_from_play_call, 'manim_hash', cairo_renderer.get_hash_from_play_call)
+
+    def get_hash_from_play_call(scene, camera, animations, mobjects):
+        if getattr(scene, 'play_key_parts', None) is None:
+            return manim_hash(scene, camera, animations, mobjects)
+        return play_key(scene, camera, animations, mobjects)
+
+    get_hash_from_play_call.manim_hash = manim_hash
+    cairo_renderer.get_hash_from_play_call = get_hash_from_play_call
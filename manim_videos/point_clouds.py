@@ -0,0 +1,44 @@
+'''draws point clouds (PMobject) with their opacity.
+
+manim's cairo camera writes each point's rgba straight into the pixel array,
+so a point at half opacity looks the same as an opaque one once the frame is
+encoded without its alpha, and fading a cloud out shows nothing until it's
+gone. this blends points whose alpha is below 1 over what's under them
+instead. opaque clouds go through manim's code unchanged. where points
+overlap, the last one drawn wins, as in manim.
+'''
+from __future__ import annotations
+
+import functools
+
+import numpy as np
+
+
+def install():
+    from manim.camera.camera import Camera
+
+    if getattr(Camera.display_point_cloud, 'blended', False):
+        return
+    display_point_cloud = Camera.display_point_cloud
+
+    @functools.wraps(display_point_cloud)
+    def blended_display_point_cloud(self, pmobject, points, rgbas, thickness, pixel_array):
+        if len(points) == 0 or np.all(rgbas[:, 3] >= 1):
+            return display_point_cloud(self, pmobject, points, rgbas, thickness, pixel_array)
+        pixel_coords = self.thickened_coordinates(self.points_to_pixel_coords(pmobject, points), thickness)
+        # thickened_coordinates repeats every point once per nudge, in order
+        rgbas = np.tile(rgbas, (len(pixel_coords) // len(rgbas), 1))
+        on_screen = self.on_screen_pixels(pixel_coords)
+        pixel_coords = pixel_coords[on_screen]
+        rgbas = rgbas[on_screen]
+        indices = (pixel_coords[:, 0] + self.pixel_width * pixel_coords[:, 1]).astype(int)
+        pixels = pixel_array.reshape((-1, pixel_array.shape[2]))
+        under = pixels[indices] / self.rgb_max_val
+        alpha = rgbas[:, 3:]
+        blended = rgbas * alpha + under * (1 - alpha)
+        blended[:, 3] = alpha[:, 0] + under[:, 3] * (1 - alpha[:, 0])
+        pixels[indices] = (self.rgb_max_val * blended).astype(self.pixel_array_dtype)
+        pixel_array[:, :] = pixels.reshape(pixel_array.shape)
+
+    blended_display_point_cloud.blended = True
+    Camera.display_point_cloud = blended_display_point_cloud
@@ -0,0 +1,287 @@
+'''checks scenes for mistakes that would only show up part way through a render
+
+    python -m manim_videos.preflight                       # every scene of every video
+    python -m manim_videos.preflight interpreter -s Operations
+    python -m manim_videos.preflight --tex                 # also compile the formulas
+
+reads each scene's source, and the helpers it uses, without running it:
+- files: every local_path('...') and every ImageMobject/SVGMobject path
+  literal has to exist, relative to the video's directory
+- TeX: every MathTex/Tex of literal strings has to have matching
+  \\begin/\\end and \\left/\\right. unbalanced braces are only a warning,
+  manim adds the missing ones, but maybe not where they were meant to go.
+  --tex compiles them too, through the TeX cache, so they're ready when the
+  render asks for them
+- steps: a False in a Step keeps that formula from the step before, so that
+  step needs at least that many formulas, and the first step can't have any
+
+every problem is reported at once, with the main.py line it's on. with
+--resume <section>, problems in the sections of a CheckpointScene before
+that one are only warnings: they don't run when the checkpoint is up to date.
+render.py runs the file, TeX and step checks before it starts any manim
+process and leaves out scenes with errors, --no-preflight skips that.
+'''
+from __future__ import annotations
+
+import argparse
+import ast
+import re
+import sys
+from dataclasses import dataclass, replace
+
+from manim_videos.fingerprint import dependencies, local_path_calls
+from manim_videos.scenes import Video, find_video, repo_root, video_config, videos
+from manim_videos.tex_prefetch import literal_calls
+
+# mobjects that load a file given as their first argument
+_asset_classes = {'ImageMobject', 'SVGMobject'}
+# control words, and \begin{...} and \end{...} with their environment
+_tex_tokens = re.compile(r'\\(begin|end)\s*\{([^}]*)\}|\\([a-zA-Z]+)|\\.')
+
+
+@dataclass(frozen=True)
+class Problem:
+    video: Video
+    line: int
+    message: str
+    # warnings are reported, but don't stop the scene rendering
+    warning: bool = False
+
+    def __str__(self) -> str:
+        kind = 'warning: ' if self.warning else ''
+        return f'{self.video.main_py.relative_to(repo_root)}:{self.line}: {kind}{self.message}'
+
+
+def errors(problems: list[Problem]) -> list[Problem]:
+    return [problem for problem in problems if not problem.warning]
+
+
+def repaired(tex: str) -> str:
+    '''tex with braces added the way MathTex does it (_remove_stray_braces), which is what
+    manim compiles'''
+    lefts = tex.count('{') - tex.count('\\{') + tex.count('\\\\{')
+    rights = tex.count('}') - tex.count('\\}') + tex.count('\\\\}')
+    return '{' * max(0, rights - lefts) + tex + '}' * max(0, lefts - rights)
+
+
+def tex_problems(tex: str) -> list[str]:
+    '''what's wrong with a formula that latex would fail on, without running latex'''
+    problems = []
+    environments = []
+    lefts = 0
+    for match in _tex_tokens.finditer(tex):
+        command, environment, word = match.groups()
+        if command == 'begin':
+            environments.append(environment)
+        elif command == 'end':
+            if not environments:
+                problems.append(f'\\end{{{environment}}} without a \\begin')
+            elif environments.pop() != environment:
+                problems.append(f'\\end{{{environment}}} closes a different environment')
+        elif word == 'left':
+            lefts += 1
+        elif word == 'right':
+            lefts -= 1
+    problems += [f'\\begin{{{environment}}} never ended' for environment in environments]
+    if lefts:
+        problems.append(f'{abs(lefts)} \\{"left" if lefts > 0 else "right"} without a \\{"right" if lefts > 0 else "left"}')
+    return problems
+
+
+def asset_problems(video: Video, nodes: list[ast.stmt]) -> list[Problem]:
+    '''files the scene loads that aren't there'''
+    paths = [(call.lineno, call.args[0].value) for call in local_path_calls(nodes)]
+    for node in nodes:
+        for call in ast.walk(node):
+            if (
+                isinstance(call, ast.Call)
+                and isinstance(call.func, ast.Name)
+                and call.func.id in _asset_classes
+                and call.args
+                and isinstance(call.args[0], ast.Constant)
+                and isinstance(call.args[0].value, str)
+            ):
+                paths.append((call.lineno, call.args[0].value))
+    return [
+        Problem(video, line, f'missing file {path}')
+        for line, path in paths
+        if not (video.directory / path).is_file()
+    ]
+
+
+def _step_formulas(node: ast.expr) -> list[ast.expr] | None:
+    '''the formulas of a Step([...]) literal, None for anything else'''
+    if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == 'Step'):
+        return None
+    keywords = {keyword.arg: keyword.value for keyword in node.keywords}
+    formulas = node.args[0] if node.args else keywords.get('formulas')
+    if not isinstance(formulas, ast.List) or any(isinstance(formula, ast.Starred) for formula in formulas.elts):
+        return None
+    return formulas.elts
+
+
+def step_problems(video: Video, nodes: list[ast.stmt]) -> list[Problem]:
+    '''False formulas in self.steps([...]) that have nothing to keep from the step before'''
+    problems = []
+    for node in nodes:
+        for call in ast.walk(node):
+            if not (
+                isinstance(call, ast.Call)
+                and isinstance(call.func, ast.Attribute)
+                and call.func.attr == 'steps'
+                and call.args
+                and isinstance(call.args[0], ast.List)
+            ):
+                continue
+            # formulas in the step before, None when that isn't known
+            previous = 0
+            for number, step in enumerate(call.args[0].elts, 1):
+                formulas = _step_formulas(step)
+                if formulas is None:
+                    previous = None
+                    continue
+                for index, formula in enumerate(formulas):
+                    if not (isinstance(formula, ast.Constant) and formula.value is False) or previous is None:
+                        continue
+                    if number == 1:
+                        problems.append(Problem(video, formula.lineno, f'step 1 keeps formula {index + 1}, but there is no step before it'))
+                    elif index >= previous:
+                        problems.append(Problem(
+                            video, formula.lineno,
+                            f'step {number} keeps formula {index + 1}, but step {number - 1} only has {previous}',
+                        ))
+                previous = len(formulas)
+    return problems
+
+
+def formulas(tree: ast.Module, scene: str) -> list[tuple[int, str, list[str], str | None]]:
+    '''(line, whole formula, {{ }} parts, environment) of the scene's literal MathTex/Tex'''
+    return [
+        (call.lineno, separator.join(parts), parts, environment)
+        for call, parts, separator, environment in literal_calls(tree, scene)
+    ]
+
+
+def lint_problems(video: Video, tree: ast.Module, scene: str) -> list[Problem]:
+    problems = []
+    for line, formula, _, _ in formulas(tree, scene):
+        problems += [Problem(video, line, f'{problem} in {formula!r}') for problem in tex_problems(formula)]
+        if repaired(formula.strip()) != formula.strip():
+            problems.append(Problem(video, line, f'unbalanced braces in {formula!r}, manim adds the missing ones', warning=True))
+    return problems
+
+
+def compile_problems(video: Video, tree: ast.Module, scenes: list[str]) -> list[Problem]:
+    '''formulas latex fails on. compiles them like manim would, the whole formula and then
+    each {{ }} part, so the render finds them in the TeX cache'''
+    from manim import config
+
+    from manim_videos import tex_cache
+
+    found = {}
+    for scene in scenes:
+        for line, formula, parts, environment in formulas(tree, scene):
+            for expression in [formula, *parts]:
+                # lint already reports those that latex can only fail on
+                if expression.strip() and not tex_problems(expression):
+                    found.setdefault((repaired(expression.strip()), environment), line)
+    problems = []
+    with video_config(video, None):
+        tex_template = config['tex_template']
+        tex_cache.cache.compile_many([(expression, environment, tex_template) for expression, environment in found])
+        for (expression, environment), line in found.items():
+            try:
+                tex_cache.cache.compile(expression, environment, tex_template)
+            except ValueError:
+                problems.append(Problem(video, line, f'latex error in {expression!r}'))
+    return problems
+
+
+def skipped_sections(tree: ast.Module, scene: str, resume: str) -> list[ast.FunctionDef]:
+    '''the section methods of a CheckpointScene that resuming from resume doesn't run, if its
+    checkpoint is up to date'''
+    for node in tree.body:
+        if not (isinstance(node, ast.ClassDef) and node.name == scene):
+            continue
+        methods = {method.name: method for method in node.body if isinstance(method, ast.FunctionDef)}
+        for statement in node.body:
+            if (
+                isinstance(statement, ast.Assign)
+                and any(isinstance(target, ast.Name) and target.id == 'sections' for target in statement.targets)
+                and isinstance(statement.value, (ast.Tuple, ast.List))
+            ):
+                sections = [element.value for element in statement.value.elts if isinstance(element, ast.Constant)]
+                if resume in sections:
+                    return [methods[name] for name in sections[:sections.index(resume)] if name in methods]
+    return []
+
+
+def check(video: Video, scenes: list[str], tex: bool = False, resume: str | None = None) -> dict[str, list[Problem]]:
+    '''problems in each of the video's scenes. with tex, also compiles their formulas. with
+    resume, problems only in the sections before it are warnings'''
+    tree = ast.parse(video.main_py.read_text(), filename=str(video.main_py))
+    found = {}
+    for scene in scenes:
+        nodes = dependencies(tree, scene)
+        found[scene] = [
+            *asset_problems(video, nodes),
+            *lint_problems(video, tree, scene),
+            *step_problems(video, nodes),
+        ]
+    if tex:
+        compiled = compile_problems(video, tree, scenes)
+        for scene in scenes:
+            lines = {line for line, _, _, _ in formulas(tree, scene)}
+            found[scene] += [problem for problem in compiled if problem.line in lines]
+    if resume:
+        for scene in scenes:
+            skipped = [(method.lineno, method.end_lineno) for method in skipped_sections(tree, scene, resume)]
+            found[scene] = [
+                replace(problem, warning=True, message=f'{problem.message}, before --resume {resume}')
+                if any(start <= problem.line <= end for start, end in skipped) else problem
+                for problem in found[scene]
+            ]
+    return found
+
+
+def report(found: dict[tuple[Video, str], list[Problem]]) -> str:
+    '''each problem once, sorted by file and line, with the scenes it's in'''
+    scenes: dict[Problem, list[str]] = {}
+    for (_, scene), problems in found.items():
+        for problem in problems:
+            scenes.setdefault(problem, []).append(scene)
+    return '\n'.join(
+        f'{problem} ({", ".join(names)})'
+        for problem, names in sorted(scenes.items(), key=lambda item: (item[0].video.name, item[0].line, item[0].message))
+    )
+
+
+def parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m manim_videos.preflight', description=__doc__.split('\n')[0])
+    parser.add_argument('videos', nargs='*', help='video directories, like type-checker (default: all)')
+    parser.add_argument('-s', '--scene', dest='scenes', action='append', help='only check this scene (repeatable)')
+    parser.add_argument('--tex', action='store_true', help='also compile every literal formula with latex')
+    parser.add_argument('--resume', metavar='SECTION', help='check as for render.py --resume SECTION')
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parser().parse_args(argv)
+    selected = [find_video(name) for name in args.videos] if args.videos else videos()
+    found = {}
+    for video in selected:
+        scenes = [scene for scene in video.scene_names() if not args.scenes or scene in args.scenes]
+        for scene, problems in check(video, scenes, args.tex, args.resume).items():
+            found[video, scene] = problems
+    if not found:
+        print('nothing to check')
+        return 1
+    if any(found.values()):
+        print(report(found))
+    failed = [key for key, problems in found.items() if errors(problems)]
+    print(f'{len(found) - len(failed)} of {len(found)} scenes ok')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
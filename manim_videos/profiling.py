@@ -0,0 +1,305 @@
+'''opt-in per play() profiling, turned on by MANIM_VIDEOS_PROFILE=1 (or render.py --profile).
+
+every play() and wait() becomes a record with:
+- the line(s) in main.py it was called from
+- the animation types, and the mobject and point counts on screen
+- how many frames it wrote
+- seconds spent in
+    build        construct code since the previous play (mobjects, TeX), plus
+                 compiling and beginning the animations
+    interpolate  Scene.update_to_time, animations and updaters
+    rasterize    the renderer drawing frames with cairo
+    encode       the file writer encoding the play's frames on its writer
+                 thread, and flushing and closing the partial movie
+    other        the rest of play()
+- wall, the play's seconds from the end of the previous one
+
+encoding runs on its own thread, alongside interpolate and rasterize, so a
+play's columns can add up to more than its wall time. the time play()
+spends waiting for the encoder (handing it frames, joining its thread) is
+already in encode, and isn't counted again as other.
+
+when the scene finishes, the records go to <media_dir>/profile/<Scene>.json
+and the slowest plays are printed as a table.
+'''
+from __future__ import annotations
+
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+CATEGORIES = ('build', 'interpolate', 'rasterize', 'encode', 'other')
+
+
+def enabled() -> bool:
+    return os.environ.get('MANIM_VIDEOS_PROFILE', '') not in ('', '0')
+
+
+def call_lines(scene) -> list[int]:
+    '''lines of the scene's own file on the current stack, outermost first'''
+    scene_file = getattr(sys.modules.get(type(scene).__module__), '__file__', None)
+    lines = []
+    frame = sys._getframe()
+    while frame is not None:
+        if scene_file and frame.f_code.co_filename == scene_file:
+            lines.append(frame.f_lineno)
+        frame = frame.f_back
+    return lines[::-1]
+
+
+@dataclass
+class PlayRecord:
+    index: int
+    # main.py lines, outermost call first
+    lines: list[int]
+    animations: list[str]
+    mobjects: int = 0
+    points: int = 0
+    frames: int = 0
+    seconds: dict[str, float] = field(default_factory=lambda: dict.fromkeys(CATEGORIES, 0.0))
+    wall: float = 0.0
+
+    @property
+    def total(self) -> float:
+        return sum(self.seconds.values())
+
+
+class Profiler:
+    def __init__(self, scene):
+        self.scene = scene
+        self.records: list[PlayRecord] = []
+        self.current: PlayRecord | None = None
+        self.gap = 0.0
+        # play()'s time inside the file writer, which encode covers
+        self.blocked = 0.0
+        # the writer thread adds to encode while play() adds to the rest
+        self.lock = threading.Lock()
+        # construct time that isn't part of any play gets charged to the next one's build
+        self.last_end = time.perf_counter()
+        self.start = self.last_end
+        self.finish_seconds = 0.0
+
+    def begin_play(self, animations):
+        now = time.perf_counter()
+        self.current = PlayRecord(
+            index=len(self.records),
+            lines=call_lines(self.scene),
+            animations=[type(animation).__name__ for animation in animations],
+        )
+        self.gap = now - self.last_end
+        self.blocked = 0.0
+        self.current.seconds['build'] += self.gap
+        return now
+
+    def end_play(self, start: float):
+        record = self.current
+        family = [member for mobject in self.scene.mobjects for member in mobject.get_family()]
+        record.mobjects = len(family)
+        record.points = sum(len(getattr(member, 'points', ())) for member in family)
+        self.last_end = time.perf_counter()
+        accounted = sum(record.seconds[category] for category in ('build', 'interpolate', 'rasterize')) - self.gap
+        record.seconds['other'] += (self.last_end - start) - accounted - self.blocked
+        record.wall = self.last_end - start + self.gap
+        self.records.append(record)
+        self.current = None
+
+    def add(self, category: str, seconds: float, record: PlayRecord | None = None):
+        '''adds to record, or the play that's running'''
+        record = record or self.current
+        if record is not None:
+            with self.lock:
+                record.seconds[category] += seconds
+
+    def block(self, seconds: float):
+        if self.current is not None:
+            self.blocked += seconds
+
+    def report(self) -> dict:
+        from manim_videos import tex_cache
+        totals = dict.fromkeys(CATEGORIES, 0.0)
+        for record in self.records:
+            for category, seconds in record.seconds.items():
+                totals[category] += seconds
+        return {
+            'scene': type(self.scene).__name__,
+            'seconds': time.perf_counter() - self.start,
+            'finish_seconds': self.finish_seconds,
+            'frames': sum(record.frames for record in self.records),
+            'totals': totals,
+            'tex': dict(tex_cache.cache.stats),
+            'plays': [{**asdict(record), 'total': record.total} for record in self.records],
+        }
+
+    def table(self, limit: int = 20) -> str:
+        rows = [('#', 'line', 'animations', 'frames', 'points', *CATEGORIES, 'wall')]
+        for record in sorted(self.records, key=lambda record: -record.wall)[:limit]:
+            rows.append((
+                str(record.index),
+                '>'.join(map(str, record.lines)),
+                ','.join(record.animations)[:40],
+                str(record.frames),
+                str(record.points),
+                *(f'{record.seconds[category]:.3f}' for category in CATEGORIES),
+                f'{record.wall:.3f}',
+            ))
+        widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+        return '\n'.join('  '.join(cell.rjust(width) for cell, width in zip(row, widths)) for row in rows)
+
+    def write(self, directory: Path) -> Path:
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'{type(self.scene).__name__}.json'
+        path.write_text(json.dumps(self.report(), indent=2))
+        return path
+
+
+# the scene being rendered, one at a time per process
+profiler: Profiler | None = None
+
+
+def _timed(cls, name: str, category: str):
+    method = getattr(cls, name)
+
+    @functools.wraps(method)
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            if profiler is not None:
+                profiler.add(category, time.perf_counter() - start)
+
+    setattr(cls, name, timed)
+
+
+def install():
+    if not enabled():
+        return
+    from manim import Scene, config
+    from manim.renderer.cairo_renderer import CairoRenderer
+    from manim.scene.scene_file_writer import SceneFileWriter
+
+    if getattr(Scene.render, 'profiled', False):
+        return
+
+    render = Scene.render
+
+    @functools.wraps(render)
+    def profiled_render(self, *args, **kwargs):
+        global profiler
+        profiler = Profiler(self)
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            path = profiler.write(Path(config.get_dir('media_dir')) / 'profile')
+            print(profiler.table())
+            print(f'profile written to {path}')
+            profiler = None
+
+    profiled_render.profiled = True
+    Scene.render = profiled_render
+
+    play = CairoRenderer.play
+
+    @functools.wraps(play)
+    def profiled_play(self, scene, *args, **kwargs):
+        if profiler is None:
+            return play(self, scene, *args, **kwargs)
+        start = profiler.begin_play(args)
+        try:
+            return play(self, scene, *args, **kwargs)
+        finally:
+            profiler.end_play(start)
+
+    CairoRenderer.play = profiled_play
+
+    scene_finished = CairoRenderer.scene_finished
+
+    @functools.wraps(scene_finished)
+    def profiled_scene_finished(self, scene):
+        start = time.perf_counter()
+        try:
+            return scene_finished(self, scene)
+        finally:
+            if profiler is not None:
+                profiler.finish_seconds += time.perf_counter() - start
+
+    CairoRenderer.scene_finished = profiled_scene_finished
+
+    _timed(Scene, 'compile_animation_data', 'build')
+    _timed(Scene, 'begin_animations', 'build')
+    _timed(Scene, 'update_to_time', 'interpolate')
+    _timed(CairoRenderer, 'update_frame', 'rasterize')
+
+    write_frame = SceneFileWriter.write_frame
+
+    @functools.wraps(write_frame)
+    def counted_write_frame(self, frame_or_renderer, num_frames=1):
+        if profiler is None or profiler.current is None:
+            return write_frame(self, frame_or_renderer, num_frames)
+        profiler.current.frames += num_frames
+        start = time.perf_counter()
+        try:
+            # only queues the frame, but waits when the encoder is behind
+            return write_frame(self, frame_or_renderer, num_frames)
+        finally:
+            profiler.block(time.perf_counter() - start)
+
+    SceneFileWriter.write_frame = counted_write_frame
+
+    open_partial_movie_stream = SceneFileWriter.open_partial_movie_stream
+
+    @functools.wraps(open_partial_movie_stream)
+    def profiled_open_partial_movie_stream(self, *args, **kwargs):
+        result = open_partial_movie_stream(self, *args, **kwargs)
+        # the play whose frames the writer thread encodes
+        self.profile_record = profiler.current if profiler is not None else None
+        self.profile_joined = 0.0
+        thread = getattr(self, 'writer_thread', None)
+        if thread is not None:
+            join = thread.join
+
+            def timed_join(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return join(*args, **kwargs)
+                finally:
+                    self.profile_joined += time.perf_counter() - start
+
+            thread.join = timed_join
+        return result
+
+    SceneFileWriter.open_partial_movie_stream = profiled_open_partial_movie_stream
+
+    encode_and_write_frame = SceneFileWriter.encode_and_write_frame
+
+    @functools.wraps(encode_and_write_frame)
+    def profiled_encode_and_write_frame(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return encode_and_write_frame(self, *args, **kwargs)
+        finally:
+            if profiler is not None:
+                profiler.add('encode', time.perf_counter() - start, getattr(self, 'profile_record', None))
+
+    SceneFileWriter.encode_and_write_frame = profiled_encode_and_write_frame
+
+    close_partial_movie_stream = SceneFileWriter.close_partial_movie_stream
+
+    @functools.wraps(close_partial_movie_stream)
+    def profiled_close_partial_movie_stream(self):
+        start = time.perf_counter()
+        try:
+            return close_partial_movie_stream(self)
+        finally:
+            if profiler is not None:
+                seconds = time.perf_counter() - start
+                profiler.block(seconds)
+                # joining waits for encoding that's already counted, the flush and close are new
+                profiler.add('encode', seconds - getattr(self, 'profile_joined', 0.0), getattr(self, 'profile_record', None))
+
+    SceneFileWriter.close_partial_movie_stream = profiled_close_partial_movie_stream
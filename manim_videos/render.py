@@ -0,0 +1,323 @@
+'''renders every scene of one or more videos in parallel
+
+    python -m manim_videos.render                      # all videos, manim.cfg quality
+    python -m manim_videos.render type-checker -ql     # one video, low quality
+    python -m manim_videos.render interpreter -s Operations -s If
+    python -m manim_videos.render interpreter -s Operations --split 8
+
+each scene is its own manim process, run from the video's directory so its
+manim.cfg applies and its output lands in <video>/media. logs go to
+<video>/media/render-logs/<Scene>.log.
+'''
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+from manim_videos import preflight, split
+from manim_videos.fingerprint import Manifest, scene_fingerprint
+from manim_videos.scenes import Video, find_video, videos
+
+# manim's quality flags and the folder each one renders into
+QUALITIES = {
+    'l': '480p15',
+    'm': '720p30',
+    'h': '1080p60',
+    'p': '1440p60',
+    'k': '2160p60',
+}
+
+
+@dataclass(frozen=True)
+class Job:
+    video: Video
+    scene: str
+    # one of QUALITIES, or None for whatever manim.cfg says
+    quality: str | None = None
+    # (first, last) play to render, for one part of a --split scene, or None for all of them
+    plays: tuple[int, int] | None = None
+
+    @property
+    def name(self) -> str:
+        part = f' plays {self.plays[0]}-{self.plays[1]}' if self.plays else ''
+        return f'{self.video.name}/{self.scene}{part}'
+
+    @property
+    def output_name(self) -> str:
+        return f'{self.scene}_part{self.plays[0]}' if self.plays else self.scene
+
+    @property
+    def log_file(self) -> Path:
+        part = f'.plays-{self.plays[0]}-{self.plays[1]}' if self.plays else ''
+        return self.video.media_dir / 'render-logs' / f'{self.scene}{part}.log'
+
+    @property
+    def quality_folder(self) -> str:
+        if self.quality:
+            return QUALITIES[self.quality]
+        # manim's own defaults, which manim.cfg overrides
+        config = self.video.config()
+        return f"{config.get('pixel_height', '1080')}p{config.get('frame_rate', '60')}"
+
+    @property
+    def movie(self) -> Path:
+        return self.video.media_dir / 'videos' / 'main' / self.quality_folder / f'{self.output_name}.mp4'
+
+    def outputs(self) -> list[Path]:
+        '''rendered files, the movie or the last frame for scenes that never play()'''
+        images = self.video.media_dir / 'images' / 'main'
+        return [path for path in [self.movie, *images.glob(f'{self.scene}_*.png')] if path.is_file()]
+
+    def command(self, *options: str) -> list[str]:
+        quality = [f'-q{self.quality}'] if self.quality else []
+        plays = ['-n', f'{self.plays[0]},{self.plays[1]}', '-o', self.output_name] if self.plays else []
+        return [sys.executable, '-m', 'manim', 'render', *quality, *plays, *options, 'main.py', self.scene]
+
+
+@dataclass(frozen=True)
+class Result:
+    job: Job
+    returncode: int
+    seconds: float
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+
+def run(job: Job, env: dict[str, str] | None = None, options: tuple[str, ...] = (), log_file: Path | None = None) -> Result:
+    log_file = log_file or job.log_file
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    with log_file.open('w') as log:
+        process = subprocess.run(
+            job.command(*options),
+            cwd=job.video.directory,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            env={**os.environ, **(env or {})},
+        )
+    return Result(job, process.returncode, time.perf_counter() - start)
+
+
+def times_file(video: Video) -> Path:
+    return video.media_dir / 'render-times.json'
+
+
+def previous_times(video: Video) -> dict[str, float]:
+    try:
+        return json.loads(times_file(video).read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_times(results: list[Result]):
+    by_video: dict[Video, list[Result]] = {}
+    for result in results:
+        by_video.setdefault(result.job.video, []).append(result)
+    for video, video_results in by_video.items():
+        times = previous_times(video)
+        times.update({result.job.scene: result.seconds for result in video_results if result.ok and not result.job.plays})
+        times_file(video).parent.mkdir(parents=True, exist_ok=True)
+        times_file(video).write_text(json.dumps(times, indent=2))
+
+
+def render_all(jobs: list[Job], workers: int, env: dict[str, str] | None = None) -> list[Result]:
+    '''runs jobs across workers manim processes, longest (last time) first'''
+    times = {video: previous_times(video) for video in {job.video for job in jobs}}
+    ordered = sorted(jobs, key=lambda job: -times[job.video].get(job.scene, float('inf')))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run, job, env) for job in ordered]
+        results = []
+        for future in as_completed(futures):
+            result = future.result()
+            status = 'ok' if result.ok else f'FAILED, see {result.job.log_file}'
+            print(f'{result.job.name}: {result.seconds:.1f}s {status}', flush=True)
+            results.append(result)
+    save_times(results)
+    return results
+
+
+def count_plays(job: Job, env: dict[str, str] | None = None) -> list[int] | None:
+    '''frames each of the scene's plays writes, from a --dry_run of it with every animation
+    skipped (see split.install), None if that failed'''
+    with tempfile.TemporaryDirectory() as directory:
+        plays = Path(directory) / 'plays.json'
+        log_file = job.log_file.with_name(f'{job.scene}.plays.log')
+        result = run(job, {**(env or {}), 'MANIM_VIDEOS_PLAYS': str(plays)}, ('--dry_run',), log_file)
+        if not result.ok or not plays.is_file():
+            return None
+        return json.loads(plays.read_text())
+
+
+def render_split(jobs: list[Job], parts: int, workers: int, env: dict[str, str] | None = None) -> list[Result]:
+    '''renders each scene as up to parts processes, each doing a run of its plays, and joins
+    their movies. see split.py'''
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        frames = dict(zip(jobs, pool.map(lambda job: count_plays(job, env), jobs)))
+    # scenes that never play() or didn't dry run render whole, and fail in their own log
+    pieces = {
+        job: [replace(job, plays=plays) for plays in split.cut(frames[job], parts)] if frames[job] else [job]
+        for job in jobs
+    }
+    part_results = render_all([piece for job in jobs for piece in pieces[job]], workers, env)
+    by_job = {result.job: result for result in part_results}
+    results = []
+    for job in jobs:
+        done = [by_job[piece] for piece in pieces[job]]
+        seconds = sum(result.seconds for result in done)
+        failed = [result for result in done if not result.ok]
+        if failed:
+            results.append(Result(job, failed[0].returncode, seconds))
+        elif pieces[job][0].plays is not None:
+            try:
+                split.stitch([piece.movie for piece in pieces[job]], job.movie)
+            except Exception as error:
+                print(f'{job.name}: joining parts failed: {error}', flush=True)
+                results.append(Result(job, 1, seconds))
+                continue
+            for piece in pieces[job]:
+                piece.movie.unlink()
+            results.append(Result(job, 0, seconds))
+        else:
+            results.append(done[0])
+    save_times(results)
+    return results
+
+
+def fingerprints(jobs: list[Job]) -> dict[Job, str]:
+    return {job: scene_fingerprint(job.video, job.scene, job.quality) for job in jobs}
+
+
+def stale(jobs: list[Job], prints: dict[Job, str]) -> list[Job]:
+    '''jobs whose fingerprint changed since their last successful render, or whose output is gone'''
+    manifests = {video: Manifest(video) for video in {job.video for job in jobs}}
+    return [
+        job for job in jobs
+        if manifests[job.video].get(job.scene, job.quality) != prints[job] or not job.outputs()
+    ]
+
+
+def record(results: list[Result], prints: dict[Job, str]):
+    manifests = {video: Manifest(video) for video in {result.job.video for result in results}}
+    for result in results:
+        if result.ok:
+            manifests[result.job.video].set(result.job.scene, result.job.quality, prints[result.job])
+    for manifest in manifests.values():
+        manifest.save()
+
+
+def timing_table(results: list[Result], wall: float) -> str:
+    rows = [('video', 'scene', 'seconds', 'status')]
+    for result in sorted(results, key=lambda result: -result.seconds):
+        rows.append((
+            result.job.video.name,
+            result.job.scene,
+            f'{result.seconds:.1f}',
+            'ok' if result.ok else f'exit {result.returncode}',
+        ))
+    total = sum(result.seconds for result in results)
+    rows.append(('', 'sum of scenes', f'{total:.1f}', ''))
+    rows.append(('', 'wall clock', f'{wall:.1f}', f'{total / wall:.1f}x' if wall else ''))
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    return '\n'.join(
+        '  '.join(cell.ljust(width) if i != 2 else cell.rjust(width) for i, (cell, width) in enumerate(zip(row, widths)))
+        for row in rows
+    )
+
+
+def checked(jobs: list[Job], resume: str | None = None) -> list[Job]:
+    '''the jobs whose scenes have no preflight errors, after printing every problem found'''
+    found = {}
+    for video in dict.fromkeys(job.video for job in jobs):
+        scenes = list(dict.fromkeys(job.scene for job in jobs if job.video == video))
+        for scene, problems in preflight.check(video, scenes, resume=resume).items():
+            found[video, scene] = problems
+    if any(found.values()):
+        print(preflight.report(found))
+        for (video, scene), problems in found.items():
+            if preflight.errors(problems):
+                print(f'{video.name}/{scene}: not rendered, see above')
+        print(flush=True)
+    return [job for job in jobs if not preflight.errors(found[job.video, job.scene])]
+
+
+def make_jobs(args: argparse.Namespace) -> list[Job]:
+    selected = [find_video(name) for name in args.videos] if args.videos else videos()
+    jobs = []
+    for video in selected:
+        for scene in video.scene_names():
+            if not args.scenes or scene in args.scenes:
+                jobs.append(Job(video, scene, args.quality))
+    return jobs
+
+
+def parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m manim_videos.render', description=__doc__.split('\n')[0])
+    parser.add_argument('videos', nargs='*', help='video directories, like type-checker (default: all)')
+    parser.add_argument('-s', '--scene', dest='scenes', action='append', help='only render this scene (repeatable)')
+    parser.add_argument('-q', '--quality', choices=QUALITIES, help="manim quality flag (default: the video's manim.cfg)")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(), help='parallel manim processes (default: cores)')
+    parser.add_argument('-i', '--incremental', action='store_true', help='only render scenes whose source, assets or config changed')
+    parser.add_argument('--profile', action='store_true', help='time every play() into <video>/media/profile/<Scene>.json')
+    parser.add_argument('--draft', action='store_true', help='keyframes only, into <Scene>_draft.mp4 and a contact sheet in <video>/media/draft')
+    parser.add_argument('--resume', metavar='SECTION', help="render a CheckpointScene's sections from SECTION on, into <Scene>_from_<SECTION>.mp4")
+    parser.add_argument('--split', type=int, default=1, metavar='N', help='render each scene as up to N processes over runs of its plays, then join them')
+    parser.add_argument('--no-preflight', action='store_true', help="don't check scenes' files, TeX and steps before rendering")
+    parser.add_argument('--stale', action='store_true', help="list the scenes --incremental would render, and don't render")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parser().parse_args(argv)
+    if args.split > 1 and args.draft:
+        parser().error('--split and --draft render different movies, pick one')
+    jobs = make_jobs(args)
+    if not jobs:
+        print('nothing to render')
+        return 1
+    # fingerprint before rendering, so edits made during the render count as changes next time
+    prints = fingerprints(jobs)
+    if args.incremental or args.stale:
+        todo = stale(jobs, prints)
+        for job in jobs:
+            if job not in todo:
+                print(f'{job.video.name}/{job.scene}: up to date')
+        if args.stale:
+            for job in todo:
+                print(f'{job.video.name}/{job.scene}: stale')
+            return 0
+        jobs = todo
+        if not jobs:
+            return 0
+    # scenes that would fail part way through are left out before anything renders
+    passed = jobs if args.no_preflight else checked(jobs, args.resume)
+    if not passed:
+        return 1
+    start = time.perf_counter()
+    env = {}
+    if args.profile:
+        env['MANIM_VIDEOS_PROFILE'] = '1'
+    if args.draft:
+        env['MANIM_VIDEOS_DRAFT'] = '1'
+    if args.resume:
+        env['MANIM_VIDEOS_RESUME'] = args.resume
+    results = render_split(passed, args.split, args.jobs, env) if args.split > 1 else render_all(passed, args.jobs, env)
+    # drafts and resumed tails aren't the real thing, so they don't make a scene up to date
+    if not (args.draft or args.resume):
+        record(results, prints)
+    print()
+    print(timing_table(results, time.perf_counter() - start))
+    return 0 if len(passed) == len(jobs) and all(result.ok for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
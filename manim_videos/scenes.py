@@ -0,0 +1,103 @@
+'''finds the videos and their scenes without importing manim, and sets manim up for one'''
+from __future__ import annotations
+
+import ast
+import configparser
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parent.parent
+
+
+@dataclass(frozen=True)
+class Video:
+    '''one directory under 2024/, rendered from its own main.py and manim.cfg'''
+    directory: Path
+
+    @property
+    def name(self) -> str:
+        return self.directory.name
+
+    @property
+    def main_py(self) -> Path:
+        return self.directory / 'main.py'
+
+    @property
+    def config_file(self) -> Path:
+        return self.directory / 'manim.cfg'
+
+    @property
+    def media_dir(self) -> Path:
+        return self.directory / 'media'
+
+    def config(self) -> configparser.SectionProxy:
+        '''the [CLI] section of manim.cfg'''
+        parser = configparser.ConfigParser()
+        parser.read(self.config_file)
+        if not parser.has_section('CLI'):
+            parser.add_section('CLI')
+        return parser['CLI']
+
+    def scene_names(self) -> list[str]:
+        return scene_names(self.main_py)
+
+
+def videos(root: Path = repo_root) -> list[Video]:
+    return [Video(main_py.parent) for main_py in sorted(root.glob('20*/*/main.py'))]
+
+
+def find_video(name: str, root: Path = repo_root) -> Video:
+    '''a video by directory name (type-checker) or path (2024/type-checker)'''
+    for video in videos(root):
+        if name in (video.name, str(video.directory.relative_to(root))) or Path(name).resolve() == video.directory:
+            return video
+    raise ValueError(f'no video named {name}')
+
+
+@contextmanager
+def working_directory(path: Path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+@contextmanager
+def video_config(video: Video, quality: str | None):
+    '''manim's config as `manim render` run from the video's directory would set it'''
+    from manim import config, constants, tempconfig
+
+    with tempconfig({}), working_directory(video.directory):
+        if video.config_file.is_file():
+            config.digest_file(video.config_file)
+        config.input_file = str(video.main_py)
+        if quality:
+            config.quality = next(name for name, values in constants.QUALITIES.items() if values['flag'] == quality)
+        yield
+
+
+def _defines_scene(item: ast.stmt) -> bool:
+    if isinstance(item, ast.FunctionDef):
+        return item.name == 'construct'
+    # a CheckpointScene's construct runs its sections
+    return isinstance(item, ast.Assign) and any(
+        isinstance(target, ast.Name) and target.id == 'sections' for target in item.targets
+    )
+
+
+def scene_classes(tree: ast.Module) -> list[ast.ClassDef]:
+    '''classes that define their own construct or sections, which is what manim renders'''
+    return [
+        node for node in tree.body
+        if isinstance(node, ast.ClassDef) and any(_defines_scene(item) for item in node.body)
+    ]
+
+
+def scene_names(main_py: Path) -> list[str]:
+    '''scene class names in file order'''
+    tree = ast.parse(main_py.read_text(), filename=str(main_py))
+    return [node.name for node in scene_classes(tree)]
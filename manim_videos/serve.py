@@ -0,0 +1,170 @@
+'''a render server that keeps manim warm and re-renders scenes when their source changes
+
+    python -m manim_videos.serve                           # every video, -ql
+    python -m manim_videos.serve interpreter -s Operations -q m
+    python -m manim_videos.serve type-checker -p           # open each movie once rendered
+
+a manim run spends its first seconds importing manim, MF_Tools and pango and
+reading the TeX cache before drawing anything. this imports all of that once
+and watches the videos' directories with watchdog. on every save the
+fingerprint of each scene (see fingerprint.py) is checked, and only scenes
+whose class, helpers, the modules next to main.py, local_path files or
+manim.cfg changed are rendered, in this process, with the video's manim.cfg
+and main.py run again as a fresh module. formulas stay in the TeX cache's
+memory, glyph maps in their memo, and unchanged plays reuse their partial
+movies, so a small edit only draws the plays it touched.
+
+renders are only for previewing: they don't update the build manifest
+render.py --incremental uses. a failing render prints its traceback and the
+server keeps going. edits to manim_videos/ itself need a restart.
+'''
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import queue
+import sys
+import time
+import traceback
+from pathlib import Path
+from types import ModuleType
+
+from manim_videos.fingerprint import scene_fingerprint
+from manim_videos.render import QUALITIES
+from manim_videos.scenes import Video, find_video, video_config, videos
+
+# editors save in several writes, changes this close together are one save
+DEBOUNCE_SECONDS = 0.1
+
+
+def load(video: Video) -> ModuleType:
+    '''runs the video's main.py as a new module, so edits to it take effect'''
+    # main.py imports the modules next to it the way manim lets it, from its directory,
+    # and those run again too
+    if str(video.directory) not in sys.path:
+        sys.path.insert(0, str(video.directory))
+    for path in video.directory.glob('*.py'):
+        sys.modules.pop(path.stem, None)
+    name = f'manim_videos_serve_{video.name.replace("-", "_")}'
+    spec = importlib.util.spec_from_file_location(name, video.main_py)
+    module = importlib.util.module_from_spec(spec)
+    # dataclasses and the profiler look the module up by name
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class Server:
+    def __init__(self, selected: list[Video], scenes: list[str] | None, quality: str | None, preview: bool):
+        self.videos = selected
+        self.scenes = scenes
+        self.quality = quality
+        self.preview = preview
+        self.changes: queue.Queue[Video] = queue.Queue()
+        # fingerprints of what's been rendered, or was there when the server started
+        self.rendered: dict[tuple[Video, str], str] = {}
+
+    def scene_names(self, video: Video) -> list[str]:
+        return [scene for scene in video.scene_names() if not self.scenes or scene in self.scenes]
+
+    def warm_up(self):
+        '''imports manim and runs every main.py once, and takes the current fingerprints as rendered'''
+        start = time.perf_counter()
+        import manim  # noqa: F401
+
+        for video in self.videos:
+            for scene in self.scene_names(video):
+                self.rendered[video, scene] = scene_fingerprint(video, scene, self.quality)
+            try:
+                with video_config(video, self.quality):
+                    load(video)
+            except Exception:
+                traceback.print_exc()
+        print(f'warmed up in {time.perf_counter() - start:.1f}s', flush=True)
+
+    def refresh(self, video: Video):
+        '''renders the video's scenes whose fingerprint changed'''
+        try:
+            prints = {scene: scene_fingerprint(video, scene, self.quality) for scene in self.scene_names(video)}
+        except SyntaxError as error:
+            print(f'{video.name}: {error}', flush=True)
+            return
+        changed = [scene for scene, fingerprint in prints.items() if self.rendered.get((video, scene)) != fingerprint]
+        if not changed:
+            return
+        with video_config(video, self.quality):
+            try:
+                module = load(video)
+            except Exception:
+                traceback.print_exc()
+                return
+        for scene in changed:
+            start = time.perf_counter()
+            try:
+                with video_config(video, self.quality):
+                    getattr(module, scene)().render(preview=self.preview)
+            except Exception:
+                traceback.print_exc()
+                print(f'{video.name}/{scene}: FAILED', flush=True)
+                continue
+            # failed scenes keep their old fingerprint, so the next save tries them again
+            self.rendered[video, scene] = prints[scene]
+            print(f'{video.name}/{scene}: {time.perf_counter() - start:.2f}s', flush=True)
+
+    def watch(self):
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        server = self
+
+        class Changes(FileSystemEventHandler):
+            def __init__(self, video: Video):
+                self.video = video
+
+            def on_any_event(self, event):
+                path = Path(event.src_path)
+                # renders write into media/, which would set off another render
+                if event.is_directory or self.video.media_dir in path.parents or '__pycache__' in path.parts:
+                    return
+                server.changes.put(self.video)
+
+        observer = Observer()
+        for video in self.videos:
+            observer.schedule(Changes(video), str(video.directory), recursive=True)
+        observer.start()
+        print(f'watching {", ".join(video.name for video in self.videos)}, ctrl-c to stop', flush=True)
+        try:
+            while True:
+                pending = [self.changes.get()]
+                time.sleep(DEBOUNCE_SECONDS)
+                while not self.changes.empty():
+                    pending.append(self.changes.get())
+                for video in dict.fromkeys(pending):
+                    self.refresh(video)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            observer.stop()
+            observer.join()
+
+
+def parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m manim_videos.serve', description=__doc__.split('\n')[0])
+    parser.add_argument('videos', nargs='*', help='video directories, like type-checker (default: all)')
+    parser.add_argument('-s', '--scene', dest='scenes', action='append', help='only render this scene (repeatable)')
+    parser.add_argument('-q', '--quality', choices=QUALITIES, default='l', help='manim quality flag (default: l)')
+    parser.add_argument('-p', '--preview', action='store_true', help='open each movie once it renders')
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parser().parse_args(argv)
+    selected = [find_video(name) for name in args.videos] if args.videos else videos()
+    server = Server(selected, args.scenes, args.quality, args.preview)
+    server.warm_up()
+    server.watch()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
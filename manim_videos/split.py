@@ -0,0 +1,125 @@
+'''renders one long scene as several manim processes, each doing a run of its plays.
+
+    python -m manim_videos.render interpreter -s Operations --split 8
+
+manim's -n a,b renders only plays a through b: construct still runs from the
+top, but the plays before a jump straight to their end and write no frames
+(manim still draws that end frame once each), and the scene ends after b.
+so a scene is split by:
+1. running its construct once with every animation skipped, like manim's
+   -n does for the plays before a, to list its plays and how many frames
+   each would write (written to MANIM_VIDEOS_PLAYS by the install() hook
+   here). unlike -n, not even the end frames are drawn, so this takes about
+   as long as construct
+2. cutting that list into runs with about as many frames each
+3. rendering each run in its own process, into <Scene>_part<k>.mp4
+4. joining the parts, in order, into <Scene>.mp4 without re-encoding
+
+static waits count as one frame, since manim draws them once. the parts
+run construct once each and only draw their own plays, and the end frame of
+each play before them, so a long scene's wall time drops with the number of
+cores.
+'''
+from __future__ import annotations
+
+import functools
+import json
+import math
+import os
+import tempfile
+from pathlib import Path
+
+
+def plays_file() -> str | None:
+    return os.environ.get('MANIM_VIDEOS_PLAYS') or None
+
+
+def cut(frames: list[int], parts: int) -> list[tuple[int, int]]:
+    '''(first, last) play ranges, contiguous and inclusive, with about as many frames in each'''
+    parts = max(1, min(parts, len(frames)))
+    total = sum(frames)
+    ranges = []
+    first = 0
+    done = 0
+    for index, count in enumerate(frames):
+        done += count
+        remaining_plays = len(frames) - index - 1
+        remaining_parts = parts - len(ranges) - 1
+        # close a range once it has its share, keeping a play for each range still to come
+        if remaining_parts and (done >= total * (len(ranges) + 1) / parts or remaining_plays == remaining_parts):
+            ranges.append((first, index))
+            first = index + 1
+    ranges.append((first, len(frames) - 1))
+    return ranges
+
+
+def stitch(parts: list[Path], output: Path):
+    '''joins movies with the same encoding into output, one after another, without re-encoding'''
+    import av
+
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', dir=output.parent, delete=False) as listing:
+        for part in parts:
+            listing.write(f"file '{part.resolve().as_posix()}'\n")
+    try:
+        with av.open(listing.name, options={'safe': '0'}, format='concat') as joined, av.open(str(output), mode='w') as movie:
+            stream = joined.streams.video[0]
+            if hasattr(movie, 'add_stream_from_template'):
+                output_stream = movie.add_stream_from_template(stream)
+            else:
+                output_stream = movie.add_stream(template=stream)
+            for packet in joined.demux(stream):
+                # the flushing packets demux ends with
+                if packet.dts is None:
+                    continue
+                # like manim's combine_files, let libav work out dts across the joins
+                packet.dts = None
+                packet.stream = output_stream
+                movie.mux(packet)
+    finally:
+        os.unlink(listing.name)
+
+
+def install():
+    '''with MANIM_VIDEOS_PLAYS set, skips every animation and writes the frame count each play()
+    would have there as a json list'''
+    path = plays_file()
+    if path is None:
+        return
+    from manim import Scene, config
+    from manim.renderer.cairo_renderer import CairoRenderer
+
+    if getattr(CairoRenderer.play, 'counted', False):
+        return
+    play = CairoRenderer.play
+    render = Scene.render
+    update_frame = CairoRenderer.update_frame
+
+    @functools.wraps(play)
+    def counted_play(self, scene, *args, **kwargs):
+        result = play(self, scene, *args, **kwargs)
+        static = scene.is_current_animation_frozen_frame()
+        # manim steps through a play's run time at 1 / frame_rate, duration is set even when skipping
+        scene.play_frames.append(1 if static else max(1, math.ceil(scene.duration * config.frame_rate)))
+        return result
+
+    @functools.wraps(update_frame)
+    def counted_update_frame(self, *args, **kwargs):
+        # manim draws a skipped play's last frame anyway, update_frame ignores skipping by default
+        if self.skip_animations:
+            return
+        return update_frame(self, *args, **kwargs)
+
+    @functools.wraps(render)
+    def counted_render(self, *args, **kwargs):
+        self.play_frames = []
+        # counting only needs construct and each play's duration, not its frames
+        self.renderer._original_skipping_status = True
+        self.renderer.skip_animations = True
+        result = render(self, *args, **kwargs)
+        Path(path).write_text(json.dumps(self.play_frames))
+        return result
+
+    counted_play.counted = True
+    CairoRenderer.play = counted_play
+    CairoRenderer.update_frame = counted_update_frame
+    Scene.render = counted_render
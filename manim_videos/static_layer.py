@@ -0,0 +1,167 @@
+'''a background layer for mobjects that sit still while others animate.
+
+manim already draws the mobjects a play doesn't touch once per play, but
+anything after the first moving mobject in the scene's list, or in the same
+group as something with an updater, is redrawn every frame. full screen Axes
+with a graph on them are most of the frame's drawing, and with a graph that
+has an updater they are redrawn every frame of every play.
+
+static(mob) marks a mobject. while no animation in a play touches it, its
+whole family is rasterized into a bitmap and frames are drawn on top of that
+bitmap instead of drawing it. the bitmap is kept across plays, and redrawn
+whenever the marked family's points or colors or the camera's frame change,
+so updaters and camera moves still show up, just without the saving.
+
+the layer is composited under everything else, whatever the scene's order
+or z_index says. MANIM_VIDEOS_STATIC_LAYER=0 turns it off.
+'''
+from __future__ import annotations
+
+import functools
+import hashlib
+import os
+
+import numpy as np
+
+# what a mobject looks like, as far as the camera is concerned
+_array_attributes = ('points', 'fill_rgbas', 'stroke_rgbas', 'background_stroke_rgbas', 'rgbas', 'pixel_array')
+_scalar_attributes = ('z_index', 'stroke_width', 'background_stroke_width')
+
+
+def enabled() -> bool:
+    return os.environ.get('MANIM_VIDEOS_STATIC_LAYER', '1') not in ('', '0')
+
+
+def static(mobject):
+    '''marks mobject to be drawn from the background layer while it isn't animated'''
+    mobject.static_layer = True
+    return mobject
+
+
+def unstatic(mobject):
+    mobject.static_layer = False
+    return mobject
+
+
+def layered(scene, animations) -> list:
+    '''the marked mobjects in the scene that none of the animations touch, in scene order'''
+    animated = {member for animation in animations for member in animation.mobject.get_family()}
+    layer = []
+
+    def walk(mobjects):
+        for mob in mobjects:
+            if getattr(mob, 'static_layer', False) and animated.isdisjoint(mob.get_family()):
+                layer.append(mob)
+            else:
+                walk(mob.submobjects)
+
+    walk(scene.mobjects)
+    return layer
+
+
+def signature(camera, mobjects) -> bytes:
+    '''changes whenever drawing mobjects with camera would draw something different'''
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(repr((
+        np.asarray(camera.frame_center).tolist(), camera.frame_width, camera.frame_height,
+        camera.pixel_width, camera.pixel_height,
+        str(getattr(camera, 'background_color', None)), getattr(camera, 'background_opacity', None),
+    )).encode())
+    for mob in camera.extract_mobject_family_members(mobjects, only_those_with_points=True):
+        hasher.update(repr((id(mob), [getattr(mob, name, None) for name in _scalar_attributes])).encode())
+        for name in _array_attributes:
+            array = getattr(mob, name, None)
+            if isinstance(array, np.ndarray):
+                hasher.update(repr(array.shape).encode())
+                hasher.update(np.ascontiguousarray(array))
+    return hasher.digest()
+
+
+class Layer:
+    '''a renderer's background bitmap and what it was drawn from'''
+    def __init__(self):
+        self.mobjects: list = []
+        self.image: np.ndarray | None = None
+        self.signature: bytes | None = None
+        # the layer signature the renderer's static_image was drawn over
+        self.static_signature: bytes | None = None
+        self.draws = 0
+
+    def refresh(self, camera) -> bool:
+        '''redraws the bitmap if the layer changed since, True if it did'''
+        current = signature(camera, self.mobjects)
+        if current == self.signature:
+            return False
+        camera.reset()
+        camera.capture_mobjects(self.mobjects)
+        self.image = camera.pixel_array.copy()
+        self.signature = current
+        self.draws += 1
+        return True
+
+
+def install():
+    from manim import Scene
+    from manim.renderer.cairo_renderer import CairoRenderer
+
+    if not enabled() or getattr(CairoRenderer.update_frame, 'static_layer', False):
+        return
+    get_moving_and_static_mobjects = Scene.get_moving_and_static_mobjects
+    update_frame = CairoRenderer.update_frame
+    save_static_frame_data = CairoRenderer.save_static_frame_data
+
+    def layer_of(renderer) -> Layer:
+        if not hasattr(renderer, 'static_layer'):
+            renderer.static_layer = Layer()
+        return renderer.static_layer
+
+    @functools.wraps(get_moving_and_static_mobjects)
+    def layered_moving_and_static_mobjects(self, animations):
+        moving, static_mobjects = get_moving_and_static_mobjects(self, animations)
+        layer = layer_of(self.renderer)
+        layer.mobjects = layered(self, animations)
+        if not layer.mobjects:
+            return moving, static_mobjects
+        # the lists are flattened families, parents would draw their layered children too
+        members = {member for mob in layer.mobjects for member in mob.get_family()}
+        return (
+            [mob for mob in moving if members.isdisjoint(mob.get_family())],
+            [mob for mob in static_mobjects if members.isdisjoint(mob.get_family())],
+        )
+
+    @functools.wraps(update_frame)
+    def layered_update_frame(self, scene, mobjects=None, include_submobjects=True, ignore_skipping=True, **kwargs):
+        layer = layer_of(self)
+        # without a list of mobjects everything is drawn, layered ones included
+        if not layer.mobjects or mobjects is None:
+            return update_frame(self, scene, mobjects, include_submobjects, ignore_skipping, **kwargs)
+        if self.skip_animations and not ignore_skipping:
+            return
+        layer.refresh(self.camera)
+        if self.static_image is not None and layer.static_signature != layer.signature:
+            # the layer changed under this play's static mobjects
+            self.camera.set_frame_to_background(layer.image)
+            self.camera.capture_mobjects(scene.static_mobjects)
+            self.static_image = self.get_frame()
+            layer.static_signature = layer.signature
+        # an empty list is the moving mobjects of a play with none, not everything
+        self.camera.set_frame_to_background(self.static_image if self.static_image is not None else layer.image)
+        kwargs['include_submobjects'] = include_submobjects
+        self.camera.capture_mobjects(mobjects, **kwargs)
+
+    @functools.wraps(save_static_frame_data)
+    def layered_save_static_frame_data(self, scene, static_mobjects):
+        layer = layer_of(self)
+        if not layer.mobjects:
+            return save_static_frame_data(self, scene, static_mobjects)
+        # drawn over the layer, so there's something to draw on even with no static mobjects
+        self.static_image = None
+        self.update_frame(scene, mobjects=list(static_mobjects))
+        self.static_image = self.get_frame()
+        layer.static_signature = layer.signature
+        return self.static_image
+
+    layered_update_frame.static_layer = True
+    Scene.get_moving_and_static_mobjects = layered_moving_and_static_mobjects
+    CairoRenderer.update_frame = layered_update_frame
+    CairoRenderer.save_static_frame_data = layered_save_static_frame_data
@@ -0,0 +1,55 @@
+import ast
+import textwrap
+
+from manim_videos.fingerprint import dependencies, imported_sources, local_paths, scene_fingerprint
+from manim_videos.scenes import find_video
+
+MAIN_PY = textwrap.dedent('''
+    import helpers
+    from manim_videos.split import cut
+
+    color = BLUE
+    unused = 1
+
+    def square():
+        return Square(color=color).add(ImageMobject(local_path('images/square.png')))
+
+    class Shapes(Scene):
+        def construct(self):
+            self.add(square())
+
+    class Other(Scene):
+        def construct(self):
+            self.add(Circle(), local_path('images/circle.png'))
+''')
+
+
+def names(nodes):
+    return [node.name if hasattr(node, 'name') else ast.unparse(node) for node in nodes]
+
+
+def test_dependencies():
+    tree = ast.parse(MAIN_PY)
+    assert names(dependencies(tree, 'Shapes')) == ['color = BLUE', 'square', 'Shapes']
+    assert names(dependencies(tree, 'Other')) == ['Other']
+
+
+def test_local_paths():
+    tree = ast.parse(MAIN_PY)
+    assert local_paths(dependencies(tree, 'Shapes')) == ['images/square.png']
+    assert local_paths(dependencies(tree, 'Other')) == ['images/circle.png']
+
+
+def test_imported_sources(tmp_path):
+    (tmp_path / 'helpers.py').write_text('import numpy\n')
+    sources = imported_sources(ast.parse(MAIN_PY), tmp_path)
+    assert tmp_path / 'helpers.py' in sources
+    assert any(path.name == 'split.py' and path.parent.name == 'manim_videos' for path in sources)
+    assert all(path.name != 'numpy.py' for path in sources)
+
+
+def test_scene_fingerprint():
+    video = find_video('polynomial')
+    assert scene_fingerprint(video, 'Temp', None) == scene_fingerprint(video, 'Temp', None)
+    assert scene_fingerprint(video, 'Temp', None) != scene_fingerprint(video, 'Intro', None)
+    assert scene_fingerprint(video, 'Temp', None) != scene_fingerprint(video, 'Temp', 'l')
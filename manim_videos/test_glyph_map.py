@@ -0,0 +1,50 @@
+import numpy as np
+
+from manim_videos.glyph_map import diff_entries, glyph_hash, merge
+
+
+class Glyph:
+    '''the parts of a VMobject glyph_hash looks at'''
+    def __init__(self, points):
+        self.points = np.asarray(points, dtype=float)
+
+    def get_center(self):
+        return (self.points.min(axis=0) + self.points.max(axis=0)) / 2
+
+
+def square(size, at=(0, 0)):
+    x, y = at
+    return Glyph([[x, y, 0], [x + size, y, 0], [x + size, y + size, 0], [x, y + size, 0]])
+
+
+def test_glyph_hash_ignores_position_and_font_size():
+    assert glyph_hash(square(0.3), 48) == glyph_hash(square(0.3, at=(2, -1)), 48)
+    assert glyph_hash(square(0.3), 48) == glyph_hash(square(0.6), 96)
+
+
+def test_glyph_hash_tells_small_glyphs_apart():
+    dot = [[0, 0, 0], [0.01, 0, 0], [0.01, 0.01, 0], [0, 0.01, 0]]
+    nudged = [[0, 0, 0], [0.01, 0.003, 0], [0.01, 0.01, 0], [0, 0.01, 0]]
+    assert glyph_hash(Glyph(dot), 48) != glyph_hash(Glyph(nudged), 48)
+    assert glyph_hash(square(0.3), 48) != glyph_hash(square(0.2), 48)
+
+
+def test_diff_entries():
+    assert diff_entries(['a', 'b', 'c'], ['a', 'b', 'c']) == [([0], [0]), ([1], [1]), ([2], [2])]
+    # one glyph swapped for another morphs, one inserted fades in
+    assert diff_entries(['a', 'b', 'c'], ['a', 'x', 'c']) == [([0], [0]), ([1], [1]), ([2], [2])]
+    assert diff_entries(['a', 'c'], ['a', 'x', 'y', 'c']) == [([0], [0]), ([], [1, 2]), ([1], [3])]
+    assert diff_entries(['a', 'b', 'c'], ['a', 'c']) == [([0], [0]), ([1], []), ([2], [1])]
+
+
+def test_diff_entries_mention_every_index():
+    before, after = list('\\frac{a}{b}:t'), list('\\frac{a}{b}=>t')
+    entries = diff_entries(before, after)
+    assert sorted(i for from_, _ in entries for i in from_) == list(range(len(before)))
+    assert sorted(j for _, to in entries for j in to) == list(range(len(after)))
+
+
+def test_merge_prefers_overrides():
+    computed = [([0], [0]), ([1, 2], [1]), ([3], [2, 3])]
+    assert merge(computed, (([1], [3]),)) == [([1], [3]), ([0], [0]), ([2], [1]), ([3], [2])]
+    assert merge(computed, ()) == computed
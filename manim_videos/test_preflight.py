@@ -0,0 +1,72 @@
+import textwrap
+
+from manim_videos.preflight import check, errors, repaired, tex_problems
+from manim_videos.scenes import Video
+
+MAIN_PY = textwrap.dedent('''
+    class Frames(CheckpointScene):
+        sections = ('intro', 'photo')
+
+        def intro(self):
+            self.play(Write(MathTex(r"\\left( x")))
+
+        def photo(self):
+            self.add(ImageMobject(local_path('images/photo.png')))
+            self.add(ImageMobject('images/there.png'))
+
+    class Steps(InterpreterScene):
+        def construct(self):
+            self.steps([
+                Step([False]),
+                Step([MathTex(r"1 + 2"), MathTex(r"{x")]),
+                Step([False, False, False]),
+            ])
+''')
+
+
+def video(tmp_path) -> Video:
+    (tmp_path / 'main.py').write_text(MAIN_PY)
+    (tmp_path / 'images').mkdir(exist_ok=True)
+    (tmp_path / 'images' / 'there.png').write_bytes(b'')
+    return Video(tmp_path)
+
+
+def test_tex_problems():
+    assert tex_problems(r'\left( \frac{1}{2} \right)') == []
+    assert tex_problems(r'\begin{cases} x \end{cases}') == []
+    assert tex_problems(r'\left( x') == [r'1 \left without a \right']
+    assert tex_problems(r'\begin{cases} x \end{array}') == [r'\end{array} closes a different environment']
+    assert tex_problems(r'\begin{cases} x') == [r'\begin{cases} never ended']
+    # braces are manim's to repair, not an error
+    assert tex_problems(r'\frac{1}{2') == []
+
+
+def test_repaired():
+    assert repaired(r'\frac{1}{2') == r'\frac{1}{2}'
+    assert repaired(r'x}') == r'{x}'
+    assert repaired(r'\{ x') == r'\{ x'
+
+
+def test_check(tmp_path):
+    found = check(video(tmp_path), ['Frames', 'Steps'])
+    assert sorted(problem.message for problem in found['Frames']) == [
+        r"1 \left without a \right in '\\left( x'",
+        'missing file images/photo.png',
+    ]
+    steps = sorted((problem.line, problem.message, problem.warning) for problem in found['Steps'])
+    assert [message for _, message, _ in steps] == [
+        'step 1 keeps formula 1, but there is no step before it',
+        "unbalanced braces in '{x', manim adds the missing ones",
+        'step 3 keeps formula 3, but step 2 only has 2',
+    ]
+    assert [warning for _, _, warning in steps] == [False, True, False]
+
+
+def test_check_resumed(tmp_path):
+    found = check(video(tmp_path), ['Frames'], resume='photo')['Frames']
+    # the intro section doesn't run when resuming from photo
+    assert [problem.message for problem in errors(found)] == ['missing file images/photo.png']
+    assert len(found) == 2
+    found = check(video(tmp_path), ['Frames'], resume='intro')['Frames']
+    assert len(errors(found)) == 2
+
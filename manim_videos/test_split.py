@@ -0,0 +1,22 @@
+from manim_videos.split import cut
+
+
+def test_cut_balances_frames():
+    assert cut([10, 10, 10, 10], 2) == [(0, 1), (2, 3)]
+    assert cut([30, 1, 1, 1, 1, 30], 2) == [(0, 2), (3, 5)]
+
+
+def test_cut_covers_every_play_once():
+    frames = [5, 1, 120, 1, 1, 60, 60, 1, 30]
+    for parts in range(1, 12):
+        ranges = cut(frames, parts)
+        assert len(ranges) == min(parts, len(frames))
+        assert ranges[0][0] == 0 and ranges[-1][1] == len(frames) - 1
+        for (_, last), (first, _) in zip(ranges, ranges[1:]):
+            assert first == last + 1
+        assert all(first <= last for first, last in ranges)
+
+
+def test_cut_one_play():
+    assert cut([100], 8) == [(0, 0)]
+    assert cut([1, 1, 1], 0) == [(0, 2)]
@@ -0,0 +1,449 @@
+'''project-level cache for compiled TeX.
+
+manim compiles every MathTex, and then every part of it again, through
+latex + dvisvgm and keys the result by the exact tex file contents under
+media/Tex. that cache is per media dir and never shrinks, and any whitespace
+difference (like the spaces EvalOf adds) is a full recompile.
+
+this keeps the compiled svgs in one directory shared by all three videos,
+keyed by whitespace-normalized source, environment and template. identical
+formulas and sub-expressions (\\mathtt{2}, \\mathrm{eval}, ...) compile once and
+are then read straight from disk, across scenes and across runs. least
+recently used entries get evicted once the cache grows past its size limit.
+
+call install() before constructing any MathTex.
+'''
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+repo_root = Path(__file__).resolve().parent.parent
+cache_root = Path(os.environ.get('MANIM_VIDEOS_CACHE', repo_root / '.cache'))
+
+# environments where whitespace is significant, these are never normalized
+_verbatim = re.compile(r'\\begin\{(verbatim|lstlisting|Verbatim)\*?\}|\\verb\W')
+# runs of spaces, except the space of a control space '\ '
+_spaces = re.compile(r'(?<!\\)[ \t]+')
+
+
+def normalize(tex: str) -> str:
+    '''collapses whitespace that TeX would collapse anyway'''
+    if _verbatim.search(tex):
+        return tex
+    tex = _spaces.sub(' ', tex)
+    tex = re.sub(r' ?\n ?', '\n', tex)
+    return tex.strip()
+
+
+def texcode(expression: str, environment: str | None, tex_template) -> str:
+    '''the full tex file manim would write for expression'''
+    if environment is not None:
+        return tex_template.get_texcode_for_expression_in_env(expression, environment)
+    return tex_template.get_texcode_for_expression(expression)
+
+
+def cache_key(expression: str, environment: str | None, tex_template) -> str:
+    '''content address of a compiled expression.
+
+    font size isn't part of it: manim compiles at a fixed size and scales the
+    svg afterwards, so the same paths serve every font size.
+    '''
+    hasher = hashlib.sha256()
+    for part in (
+        texcode(normalize(expression), environment, tex_template),
+        tex_template.tex_compiler,
+        tex_template.output_format,
+    ):
+        hasher.update(part.encode())
+        hasher.update(b'\0')
+    return hasher.hexdigest()[:32]
+
+
+class TexCache:
+    '''svgs on disk, one file per key, with file mtimes as the LRU clock'''
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory: dict[str, Path] = {}
+        # compiles counts latex runs, batched the formulas typeset by batch runs and
+        # waits the formulas construct had to wait on a prefetch for
+        self.stats = {'hits': 0, 'misses': 0, 'compiles': 0, 'batched': 0, 'waits': 0, 'evictions': 0}
+        # approximate size of the directory, None until the first scan
+        self._size: int | None = None
+        self._scratch: Path | None = None
+        self._lock = threading.Lock()
+        # keys being compiled in the background, see prefetch()
+        self.pending: dict[str, Future] = {}
+        self._pool: ThreadPoolExecutor | None = None
+
+    def path(self, key: str) -> Path:
+        return self.directory / key[:2] / f'{key}.svg'
+
+    def scratch(self, key: str) -> Path:
+        '''a private link to the cached svg.
+
+        SVGMobject writes a modified copy next to the file it parses, so
+        handing out the shared path would race with other render processes.
+        '''
+        with self._lock:
+            if self._scratch is None:
+                (self.directory / 'build').mkdir(parents=True, exist_ok=True)
+                self._scratch = Path(tempfile.mkdtemp(dir=self.directory / 'build'))
+                weakref.finalize(self, shutil.rmtree, self._scratch, ignore_errors=True)
+        link = self._scratch / f'{key}.svg'
+        if not link.exists():
+            try:
+                os.link(self.path(key), link)
+            except FileExistsError:
+                # linked by a prefetch thread in the meantime
+                pass
+            except OSError:
+                shutil.copyfile(self.path(key), link)
+        return link
+
+    def get(self, key: str) -> Path | None:
+        '''path of the cached svg for key, or None'''
+        with self._lock:
+            if key in self.memory:
+                self.stats['hits'] += 1
+                return self.memory[key]
+        try:
+            # touching it marks it as recently used
+            os.utime(self.path(key))
+            path = self.scratch(key)
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            self.memory[key] = path
+            self.stats['hits'] += 1
+        return path
+
+    def put(self, key: str, svg_file: Path) -> Path:
+        '''atomically moves svg_file into the cache'''
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # other render processes may be writing the same key, os.replace keeps it whole
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        os.close(fd)
+        shutil.copyfile(svg_file, tmp)
+        os.replace(tmp, path)
+        with self._lock:
+            if self._size is not None:
+                self._size += path.stat().st_size
+        self.evict()
+        link = self.scratch(key)
+        with self._lock:
+            self.memory[key] = link
+        return link
+
+    def entries(self) -> list[tuple[os.stat_result, Path]]:
+        entries = []
+        for path in self.directory.glob('*/*.svg'):
+            try:
+                entries.append((path.stat(), path))
+            except FileNotFoundError:
+                # evicted by another render process
+                pass
+        return entries
+
+    def evict(self):
+        '''deletes least recently used svgs until the cache is under max_bytes'''
+        if self._size is not None and self._size <= self.max_bytes:
+            return
+        entries = self.entries()
+        size = sum(stat.st_size for stat, _ in entries)
+        if size > self.max_bytes:
+            # evict a little extra so this doesn't run on every put
+            target = self.max_bytes * 0.9
+            for stat, path in sorted(entries, key=lambda entry: entry[0].st_mtime):
+                if size <= target:
+                    break
+                path.unlink(missing_ok=True)
+                size -= stat.st_size
+                with self._lock:
+                    self.stats['evictions'] += 1
+        with self._lock:
+            self._size = size
+
+    def compile(self, expression: str, environment: str | None, tex_template) -> Path:
+        '''compiled svg for expression, running latex only on a cache miss'''
+        key = cache_key(expression, environment, tex_template)
+        path = self.get(key)
+        if path is not None:
+            return path
+        with self._lock:
+            future = self.pending.get(key)
+        if future is not None:
+            # prefetched, the batch it's in may still be running
+            try:
+                future.result()
+            except Exception:
+                # the prefetch failed or was cancelled, compile it here instead
+                pass
+            path = self.get(key)
+            if path is not None:
+                with self._lock:
+                    self.stats['waits'] += 1
+                return path
+        with self._lock:
+            self.stats['misses'] += 1
+        # compile in a private directory so parallel renders never share latex output files
+        build_root = self.directory / 'build'
+        build_root.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=build_root) as build_dir:
+            svg_file = compile_svg(
+                texcode(normalize(expression), environment, tex_template),
+                tex_template,
+                Path(build_dir),
+            )
+            with self._lock:
+                self.stats['compiles'] += 1
+            return self.put(key, svg_file)
+
+    def has(self, key: str) -> bool:
+        return key in self.memory or self.path(key).is_file()
+
+    def batches(self, requests: list[tuple[str, str | None, object]], size: int) -> list[list[tuple[str, str, object]]]:
+        '''the uncached, not yet pending requests as (key, tex code, template) batches of one
+        template each, in request order'''
+        todo: dict[str, tuple[str, str, object]] = {}
+        for expression, environment, tex_template in requests:
+            key = cache_key(expression, environment, tex_template)
+            if key not in todo and key not in self.pending and not self.has(key):
+                todo[key] = (key, texcode(normalize(expression), environment, tex_template), tex_template)
+        by_template: dict[tuple[str, str, str], list[tuple[str, str, object]]] = {}
+        for key, code, tex_template in todo.values():
+            template_id = (tex_template.tex_compiler, tex_template.output_format, _head(code))
+            by_template.setdefault(template_id, []).append((key, code, tex_template))
+        return [
+            items[start:start + size]
+            for items in by_template.values()
+            for start in range(0, len(items), size)
+        ]
+
+    def compile_batch(self, batch: list[tuple[str, str, object]], fall_back: bool = False):
+        '''typesets a batch in one latex run. if that fails and fall_back is set, compiles
+        the formulas one at a time, so one broken formula doesn't hold up the rest'''
+        build_root = self.directory / 'build'
+        build_root.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=build_root) as build_dir:
+            svg_files = compile_batch_svgs([code for _, code, _ in batch], batch[0][2], Path(build_dir))
+            if svg_files is not None:
+                with self._lock:
+                    self.stats['compiles'] += 1
+                    self.stats['batched'] += len(batch)
+                for (key, _, _), svg_file in zip(batch, svg_files):
+                    self.put(key, svg_file)
+                return
+        if not fall_back:
+            return
+        for key, code, tex_template in batch:
+            with tempfile.TemporaryDirectory(dir=build_root) as build_dir:
+                try:
+                    svg_file = compile_svg(code, tex_template, Path(build_dir))
+                except ValueError:
+                    # compile() hits it again on demand and reports it there
+                    continue
+                with self._lock:
+                    self.stats['compiles'] += 1
+                self.put(key, svg_file)
+
+    def compile_many(self, requests: list[tuple[str, str | None, object]]):
+        '''compiles every (expression, environment, tex_template) that isn't cached yet,
+        with one latex run per template instead of one per formula.
+
+        anything a batch can't handle is left for compile() to do on demand,
+        which is also where a broken formula reports its error.
+        '''
+        for batch in self.batches(requests, BATCH_SIZE):
+            self.compile_batch(batch)
+
+    def prefetch(self, requests: list[tuple[str, str | None, object]]):
+        '''starts compiling the uncached requests on background threads, in small batches
+        in request order, so the first formulas a scene needs are ready first.
+        compile() waits for a pending key instead of compiling it again.
+        '''
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix='tex-prefetch')
+        for batch in self.batches(requests, PREFETCH_BATCH_SIZE):
+            future = self._pool.submit(self.compile_batch, batch, True)
+            with self._lock:
+                for key, _, _ in batch:
+                    self.pending[key] = future
+            future.add_done_callback(functools.partial(self._done, [key for key, _, _ in batch]))
+
+    def _done(self, keys: list[str], future: Future):
+        with self._lock:
+            for key in keys:
+                if self.pending.get(key) is future:
+                    del self.pending[key]
+
+    def cancel_prefetch(self):
+        '''drops prefetches that haven't started, once the scene that wanted them is done'''
+        with self._lock:
+            futures = set(self.pending.values())
+        for future in futures:
+            future.cancel()
+
+
+# formulas per batched latex run, so one bad formula doesn't cost a huge document
+BATCH_SIZE = 200
+# prefetches run in smaller batches so the first formulas come back quickly
+PREFETCH_BATCH_SIZE = 16
+PREFETCH_WORKERS = int(os.environ.get('MANIM_VIDEOS_TEX_WORKERS', 2))
+_standalone = re.compile(r'\\documentclass(?:\[([^\]]*)\])?\{standalone\}')
+
+
+def _head(code: str) -> str:
+    '''everything up to \\begin{document}, the same for every formula of a template'''
+    return code.partition(r'\begin{document}')[0]
+
+
+def batch_document(codes: list[str]) -> str | None:
+    '''one multi page standalone document with a page per formula, or None if it can't be'''
+    head = _head(codes[0])
+    match = _standalone.search(head)
+    if match is None:
+        return None
+    options = [option for option in (match.group(1) or '').split(',') if option.strip()]
+    head = head[:match.start()] + r'\documentclass[' + ','.join([*options, 'multi']) + r']{standalone}' + head[match.end():]
+    pages = []
+    for code in codes:
+        body = code.partition(r'\begin{document}')[2].rpartition(r'\end{document}')[0]
+        pages.append('\\begin{standalone}\n' + body.strip('\n') + '\n\\end{standalone}')
+    return head + '\\begin{document}\n' + '\n'.join(pages) + '\n\\end{document}\n'
+
+
+def run_latex(code: str, tex_template, tex_file: Path) -> bool:
+    '''writes code to tex_file and typesets it next to it, from the template's
+    precompiled format when there is one (see tex_format)'''
+    from manim.utils.tex_file_writing import make_tex_compilation_command
+
+    from manim_videos import tex_format
+
+    tex_file = tex_file.resolve()
+    command = make_tex_compilation_command(
+        tex_template.tex_compiler,
+        tex_template.output_format,
+        tex_file,
+        tex_file.parent,
+    )
+    head, begin_document, body = code.partition(r'\begin{document}')
+    fmt = tex_format.precompiled(tex_template, head) if begin_document else None
+    if fmt is not None:
+        tex_file.write_text(begin_document + body, encoding='utf-8')
+        result = subprocess.run(tex_format.command_with_format(command, fmt), cwd=fmt.parent, stdout=subprocess.DEVNULL)
+        if result.returncode == 0:
+            return True
+    tex_file.write_text(code, encoding='utf-8')
+    result = subprocess.run(command, stdout=subprocess.DEVNULL)
+    if result.returncode == 0 and fmt is not None:
+        # the formula is fine, so the format is what's broken, for this process at least
+        tex_format.discard(fmt)
+    return result.returncode == 0
+
+
+def compile_batch_svgs(codes: list[str], tex_template, build_dir: Path) -> list[Path] | None:
+    '''one latex and one dvisvgm run for many formulas, an svg per formula in order.
+
+    None when the template can't be batched, latex fails, or the pages don't
+    come out one per formula.
+    '''
+    document = batch_document(codes)
+    if document is None:
+        return None
+    tex_file = build_dir / 'batch.tex'
+    if not run_latex(document, tex_template, tex_file):
+        return None
+    output = tex_file.with_suffix(tex_template.output_format)
+    subprocess.run(
+        [
+            'dvisvgm',
+            *(['--pdf'] if tex_template.output_format == '.pdf' else []),
+            '--page=1-',
+            '--no-fonts',
+            '--verbosity=0',
+            f'--output={(build_dir / "page-%p.svg").as_posix()}',
+            output.as_posix(),
+        ],
+        stdout=subprocess.DEVNULL,
+    )
+    pages = sorted(build_dir.glob('page-*.svg'), key=lambda path: int(path.stem.split('-')[1]))
+    if len(pages) != len(codes):
+        return None
+    return pages
+
+
+def compile_svg(code: str, tex_template, build_dir: Path) -> Path:
+    '''runs latex and dvisvgm on a full tex file, same as manim does'''
+    from manim.utils.tex_file_writing import convert_to_svg, print_all_tex_errors
+
+    tex_file = build_dir / 'expression.tex'
+    if not run_latex(code, tex_template, tex_file):
+        log_file = tex_file.with_suffix('.log')
+        print_all_tex_errors(log_file, tex_template.tex_compiler, tex_file)
+        # MathTex catches ValueError to explain {{ }} splitting problems
+        raise ValueError(
+            f'{tex_template.tex_compiler} error converting to'
+            f' {tex_template.output_format[1:]}. See log output above or'
+            f' the log file: {log_file}',
+        )
+    return convert_to_svg(tex_file.with_suffix(tex_template.output_format), tex_template.output_format)
+
+
+cache = TexCache(
+    cache_root / 'tex',
+    max_bytes=int(os.environ.get('MANIM_VIDEOS_TEX_CACHE_MB', 256)) * 2**20,
+)
+
+
+# (expression, environment) of every default-template formula the scene being
+# rendered compiles, so the next render can prefetch them. set by tex_prefetch
+_requested: list[tuple[str, str | None]] | None = None
+
+
+def tex_to_svg_file(expression: str, environment: str | None = None, tex_template=None) -> Path:
+    '''drop-in replacement for manim.utils.tex_file_writing.tex_to_svg_file'''
+    from manim import config
+    if tex_template is None:
+        tex_template = config['tex_template']
+    if _requested is not None and tex_template == config['tex_template']:
+        _requested.append((expression, environment))
+    return cache.compile(expression, environment, tex_template)
+
+
+def manifest_file(scene) -> Path:
+    from manim import config
+    return Path(config.get_dir('media_dir')) / 'tex-manifest' / f'{type(scene).__name__}.json'
+
+
+def load_manifest(scene) -> list[tuple[str, str | None]]:
+    try:
+        return [tuple(request) for request in json.loads(manifest_file(scene).read_text())]
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+
+
+def save_manifest(scene, requests: list[tuple[str, str | None]]):
+    path = manifest_file(scene)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(list(dict.fromkeys(requests)), indent=1))
+
+
+def install():
+    '''routes every SingleStringMathTex (so MathTex and Tex too) through the cache'''
+    from manim.mobject.text import tex_mobject
+    tex_mobject.tex_to_svg_file = tex_to_svg_file
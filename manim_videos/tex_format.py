@@ -0,0 +1,95 @@
+'''precompiled latex formats for TeX template preambles.
+
+every formula is compiled against the same documentclass and preamble, and
+latex spends most of a small formula's run loading them. this dumps the
+preamble once into a .fmt (latex -ini ... \\dump), and formulas are then
+typeset from \\begin{document} on with -fmt, so each run only reads its body.
+
+formats live in .cache/fmt, named after a hash of the preamble and the latex
+binary, so editing the template or updating TeX makes a new one. only latex
+and pdflatex are handled; other compilers, or a preamble that can't be
+dumped, compile the usual way. MANIM_VIDEOS_TEX_FORMAT=0 turns this off.
+'''
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+
+from manim_videos.tex_cache import cache_root
+
+formats_dir = cache_root / 'fmt'
+_engines = {'latex', 'pdflatex'}
+
+_lock = threading.Lock()
+# format paths by name, None for preambles that couldn't be dumped
+_formats: dict[str, Path | None] = {}
+
+
+def enabled() -> bool:
+    return os.environ.get('MANIM_VIDEOS_TEX_FORMAT', '1') not in ('', '0')
+
+
+def format_name(compiler: str, head: str) -> str | None:
+    binary = shutil.which(compiler)
+    if binary is None:
+        return None
+    hasher = hashlib.sha256()
+    for part in (compiler, binary, str(os.stat(binary).st_mtime_ns), head):
+        hasher.update(part.encode())
+        hasher.update(b'\0')
+    return f'preamble-{hasher.hexdigest()[:16]}'
+
+
+def dump(compiler: str, head: str, name: str) -> Path | None:
+    '''builds formats_dir/name.fmt from head, None if latex can't dump it'''
+    formats_dir.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=formats_dir) as build_dir:
+        preamble = Path(build_dir) / 'preamble.tex'
+        preamble.write_text(head + '\n\\dump\n', encoding='utf-8')
+        result = subprocess.run(
+            [
+                compiler, '-ini', f'-jobname={name}', '-interaction=batchmode', '-halt-on-error',
+                f'&{compiler}', preamble.name,
+            ],
+            cwd=build_dir,
+            stdout=subprocess.DEVNULL,
+        )
+        built = Path(build_dir) / f'{name}.fmt'
+        if result.returncode != 0 or not built.is_file():
+            return None
+        # other render processes may be dumping the same format
+        path = formats_dir / f'{name}.fmt'
+        os.replace(built, path)
+        return path
+
+
+def precompiled(tex_template, head: str) -> Path | None:
+    '''the format for a template's preamble, dumping it the first time'''
+    if not enabled() or tex_template.tex_compiler not in _engines or tex_template.output_format not in ('.dvi', '.pdf'):
+        return None
+    name = format_name(tex_template.tex_compiler, head)
+    if name is None:
+        return None
+    with _lock:
+        if name not in _formats:
+            path = formats_dir / f'{name}.fmt'
+            _formats[name] = path if path.is_file() else dump(tex_template.tex_compiler, head, name)
+        return _formats[name]
+
+
+def discard(path: Path):
+    '''stops this process using a format that failed to typeset a formula the plain preamble
+    could. the file stays, other render processes may be typesetting with it right now'''
+    with _lock:
+        _formats[path.stem] = None
+
+
+def command_with_format(command: list[str], path: Path) -> list[str]:
+    '''a latex command from make_tex_compilation_command, loading the format.
+    latex finds formats in the current directory, so run it from path.parent'''
+    return [command[0], f'-fmt={path.stem}', *command[1:]]
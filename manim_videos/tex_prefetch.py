@@ -0,0 +1,115 @@
+'''compiles a scene's TeX in the background while it renders.
+
+when a scene starts rendering, every formula it is expected to need is
+queued on the TeX cache's prefetch threads, in small batched latex runs:
+- the formulas it compiled last time, from media/tex-manifest/<Scene>.json,
+  in the order it asked for them
+- MathTex and Tex calls with only literal strings in the scene's source and
+  the helpers it uses, which catches formulas added or edited since then
+
+construct then finds them cached, or waits on the batch that's compiling
+them, while earlier plays are being rasterized and encoded. a wrong guess
+costs a compile nobody asks for, never a wrong formula.
+
+turned off by MANIM_VIDEOS_TEX_BATCH=0.
+'''
+from __future__ import annotations
+
+import ast
+import functools
+import os
+import re
+import sys
+
+from manim_videos import tex_cache
+from manim_videos.fingerprint import dependencies
+
+# what manim uses for each class, (argument separator, environment)
+_tex_classes = {'MathTex': (' ', 'align*'), 'Tex': ('', 'center')}
+# keywords that change what gets compiled in ways this doesn't follow
+_unpredictable = {'tex_template', 'substrings_to_isolate', 'tex_to_color_map', 'arg_separator'}
+
+
+def enabled() -> bool:
+    return os.environ.get('MANIM_VIDEOS_TEX_BATCH', '1') not in ('', '0')
+
+
+def _balanced(tex: str) -> bool:
+    tex = tex.replace(r'\{', '').replace(r'\}', '')
+    return tex.count('{') == tex.count('}')
+
+
+def literal_calls(tree: ast.Module, scene: str) -> list[tuple[ast.Call, list[str], str, str | None]]:
+    '''(call, {{ }} parts, argument separator, environment) of the MathTex/Tex calls with only
+    literal strings that the scene can reach, in file order'''
+    calls = []
+    for node in dependencies(tree, scene):
+        for call in ast.walk(node):
+            if not (isinstance(call, ast.Call) and isinstance(call.func, ast.Name) and call.func.id in _tex_classes):
+                continue
+            if not call.args or not all(isinstance(arg, ast.Constant) and isinstance(arg.value, str) for arg in call.args):
+                continue
+            separator, environment = _tex_classes[call.func.id]
+            keywords = {keyword.arg: keyword.value for keyword in call.keywords}
+            if _unpredictable & keywords.keys() or None in keywords:
+                continue
+            if 'tex_environment' in keywords:
+                if not isinstance(keywords['tex_environment'], ast.Constant):
+                    continue
+                environment = keywords['tex_environment'].value
+            parts = [part for arg in call.args for part in re.split('{{(.*?)}}', arg.value) if part]
+            calls.append((call, parts, separator, environment))
+    return calls
+
+
+def literal_requests(tree: ast.Module, scene: str) -> list[tuple[str, str | None]]:
+    '''(expression, environment) of the literal MathTex/Tex calls the scene can reach, in file
+    order. like manim, the whole formula and then each {{ }} part'''
+    requests = []
+    for _, parts, separator, environment in literal_calls(tree, scene):
+        for expression in [separator.join(parts), *parts]:
+            # manim patches up parts with stray braces before compiling, skip those
+            if expression.strip() and _balanced(expression):
+                requests.append((expression.strip(), environment))
+    return requests
+
+
+def scene_requests(scene) -> list[tuple[str, str | None]]:
+    '''what the scene compiled last time, then anything new its source mentions'''
+    requests = tex_cache.load_manifest(scene)
+    module_file = getattr(sys.modules.get(type(scene).__module__), '__file__', None)
+    if module_file is not None:
+        try:
+            with open(module_file) as file:
+                tree = ast.parse(file.read(), filename=module_file)
+            requests += literal_requests(tree, type(scene).__name__)
+        except (OSError, SyntaxError, ValueError):
+            # a scene defined somewhere dependencies() can't find, the manifest will do
+            pass
+    return list(dict.fromkeys(requests))
+
+
+def install():
+    from manim import Scene, config
+
+    if not enabled() or getattr(Scene.render, 'tex_prefetched', False):
+        return
+    render = Scene.render
+
+    @functools.wraps(render)
+    def prefetching_render(self, *args, **kwargs):
+        tex_cache.cache.prefetch([
+            (expression, environment, config['tex_template'])
+            for expression, environment in scene_requests(self)
+        ])
+        tex_cache._requested = []
+        try:
+            result = render(self, *args, **kwargs)
+            tex_cache.save_manifest(self, tex_cache._requested)
+            return result
+        finally:
+            tex_cache._requested = None
+            tex_cache.cache.cancel_prefetch()
+
+    prefetching_render.tex_prefetched = True
+    Scene.render = prefetching_render